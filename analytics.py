@@ -0,0 +1,230 @@
+# analytics.py
+"""Session statistics over hand histories in one streaming pass.
+
+SessionStats folds in one HandRecord at a time. It keeps Welford
+accumulators for the whole session and for each true-count bucket (a fixed
+array), plus a bankroll curve that is thinned as it grows, so memory does
+not depend on the number of hands. Its state serializes to JSON. `analyze`
+saves it next to the log together with the reader offset, so a run on an
+appended log only reads the new records.
+
+LiveStats adds ring buffers for rolling windows and feeds the stats line in
+the GUI.
+
+    python analytics.py session.bjh
+"""
+import argparse
+import json
+import os
+from collections import deque
+
+from engine import BLACKJACK, BLACKJACK_PUSH, DEALER_BUST, DOUBLE, PUSH, WIN
+from history import HandRecord, HistoryReader
+from counting import TC_BUCKETS, TC_MIN, tc_bucket
+
+WIN_OUTCOMES = frozenset((BLACKJACK, DEALER_BUST, WIN))
+PUSH_OUTCOMES = frozenset((BLACKJACK_PUSH, PUSH))
+CURVE_POINTS = 1000   # bankroll curve length before it is thinned
+ROLLING_WINDOW = 100  # hands in the GUI's rolling stats
+CHECKPOINT_SUFFIX = ".stats.json"
+
+
+class Welford:
+    """Running mean and variance (Welford's algorithm)"""
+    __slots__ = ('n', 'mean', 'm2')
+
+    def __init__(self, n=0, mean=0.0, m2=0.0):
+        self.n = n
+        self.mean = mean
+        self.m2 = m2
+
+    def add(self, x):
+        self.n += 1
+        delta = x - self.mean
+        self.mean += delta / self.n
+        self.m2 += delta * (x - self.mean)
+
+    @property
+    def variance(self):
+        return self.m2 / (self.n - 1) if self.n > 1 else 0.0
+
+    @property
+    def std(self):
+        return self.variance ** 0.5
+
+    def to_list(self):
+        return [self.n, self.mean, self.m2]
+
+
+class BankrollCurve:
+    """(hand, bankroll) samples; every other point is dropped and the stride doubled when full"""
+
+    def __init__(self, max_points=CURVE_POINTS, stride=1, points=None):
+        self.max_points = max_points
+        self.stride = stride
+        self.points = points or []
+
+    def add(self, hand, bankroll):
+        if hand % self.stride:
+            return
+        self.points.append((hand, bankroll))
+        if len(self.points) >= self.max_points:
+            self.stride *= 2
+            self.points = [p for p in self.points if p[0] % self.stride == 0]
+
+
+def unit_bet(record):
+    """Initial bet of a round (the recorded bet is doubled after a double down)"""
+    return record.bet // 2 if DOUBLE in record.actions else record.bet
+
+
+class SessionStats:
+    """Win rate, EV, SD, N0, EV by true count and bankroll, folded one round at a time.
+
+    EV and SD are per unit of initial bet; the bankroll is in money.
+    """
+
+    def __init__(self):
+        self.hands = 0
+        self.wins = 0
+        self.pushes = 0
+        self.result = Welford()
+        self.buckets = [Welford() for _ in range(TC_BUCKETS)]
+        self.bankroll = 0.0
+        self.peak = 0.0
+        self.max_drawdown = 0.0
+        self.curve = BankrollCurve()
+
+    def add(self, record):
+        unit = unit_bet(record) or 1
+        net = record.total_net
+        result = net / unit
+        self.hands += 1
+        if record.outcome in WIN_OUTCOMES:
+            self.wins += 1
+        elif record.outcome in PUSH_OUTCOMES:
+            self.pushes += 1
+        self.result.add(result)
+        self.buckets[tc_bucket(record.true_count)].add(result)
+
+        self.bankroll += net
+        if self.bankroll > self.peak:
+            self.peak = self.bankroll
+        elif self.peak - self.bankroll > self.max_drawdown:
+            self.max_drawdown = self.peak - self.bankroll
+        self.curve.add(self.hands, self.bankroll)
+
+    @property
+    def win_rate(self):
+        return self.wins / self.hands if self.hands else 0.0
+
+    @property
+    def ev(self):
+        return self.result.mean
+
+    @property
+    def std(self):
+        return self.result.std
+
+    @property
+    def n0(self):
+        """Hands until the expected win equals one standard deviation (variance / EV^2)"""
+        ev = self.result.mean
+        return self.result.variance / (ev * ev) if ev else float('inf')
+
+    def bucket_ev(self):
+        """{true count: (hands, EV per hand)} for non-empty buckets"""
+        return {TC_MIN + i: (b.n, b.mean) for i, b in enumerate(self.buckets) if b.n}
+
+    def to_dict(self):
+        return {
+            'hands': self.hands, 'wins': self.wins, 'pushes': self.pushes,
+            'result': self.result.to_list(),
+            'buckets': [b.to_list() for b in self.buckets],
+            'bankroll': self.bankroll, 'peak': self.peak, 'max_drawdown': self.max_drawdown,
+            'curve': {'stride': self.curve.stride, 'points': self.curve.points},
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        stats = cls()
+        stats.hands = data['hands']
+        stats.wins = data['wins']
+        stats.pushes = data['pushes']
+        stats.result = Welford(*data['result'])
+        stats.buckets = [Welford(*b) for b in data['buckets']]
+        stats.bankroll = data['bankroll']
+        stats.peak = data['peak']
+        stats.max_drawdown = data['max_drawdown']
+        stats.curve = BankrollCurve(stride=data['curve']['stride'],
+                                    points=[tuple(p) for p in data['curve']['points']])
+        return stats
+
+
+def analyze(path, checkpoint=True):
+    """SessionStats for a hand history log, resuming from its checkpoint when there is one.
+
+    `checkpoint` is True (use `<log>.stats.json`), a path, or False to always rescan.
+    """
+    checkpoint_path = path + CHECKPOINT_SUFFIX if checkpoint is True else checkpoint
+    stats, offset = SessionStats(), None
+    if checkpoint_path and os.path.exists(checkpoint_path):
+        with open(checkpoint_path) as f:
+            saved = json.load(f)
+        if saved['offset'] <= os.path.getsize(path):  # else the log was replaced
+            stats, offset = SessionStats.from_dict(saved['stats']), saved['offset']
+
+    reader = HistoryReader(path, offset)
+    for record in reader:
+        stats.add(record)
+
+    if checkpoint_path:
+        tmp_path = checkpoint_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({'offset': reader.offset, 'stats': stats.to_dict()}, f)
+        os.replace(tmp_path, checkpoint_path)
+    return stats
+
+
+class LiveStats(SessionStats):
+    """SessionStats plus rolling windows over the last `window` rounds"""
+
+    def __init__(self, window=ROLLING_WINDOW):
+        super().__init__()
+        self.recent_results = deque(maxlen=window)
+        self.recent_wins = deque(maxlen=window)
+
+    def add(self, record):
+        super().add(record)
+        self.recent_results.append(record.total_net / (unit_bet(record) or 1))
+        self.recent_wins.append(record.outcome in WIN_OUTCOMES)
+
+    def add_engine_round(self, engine):
+        """Fold in the round the engine has just settled"""
+        self.add(HandRecord.from_engine(engine))
+
+    @property
+    def rolling_ev(self):
+        return sum(self.recent_results) / len(self.recent_results) if self.recent_results else 0.0
+
+    @property
+    def rolling_win_rate(self):
+        return sum(self.recent_wins) / len(self.recent_wins) if self.recent_wins else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Session statistics for a hand history log")
+    parser.add_argument('log')
+    parser.add_argument('--rescan', action='store_true', help="ignore the checkpoint")
+    args = parser.parse_args()
+
+    stats = analyze(args.log, checkpoint=not args.rescan)
+    print(f"Hands: {stats.hands}  Win rate: {stats.win_rate:.2%}  "
+          f"EV: {stats.ev:+.4f}  SD: {stats.std:.4f}  N0: {stats.n0:,.0f}")
+    print(f"Bankroll: {stats.bankroll:+,.0f}  Max drawdown: {stats.max_drawdown:,.0f}")
+    for tc, (hands, ev) in stats.bucket_ev().items():
+        print(f"  TC {tc:+d}: {hands:>9} hands  EV {ev:+.4f}")
+
+
+if __name__ == "__main__":
+    main()
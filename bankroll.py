@@ -0,0 +1,273 @@
+# bankroll.py
+"""Risk of ruin and bankroll trajectories for a bet ramp.
+
+Replaying full games is too slow for bankroll questions. Those need
+hundreds of thousands of paths that each run thousands of hands. So the
+simulator is run once, and its hands are binned into an empirical joint
+distribution of (true count bucket, net result per unit bet). Each path then
+draws its hands independently from that distribution. One block of hands
+for every path is drawn as a NumPy array, and the bankrolls are cumulative
+sums of the draws:
+
+    outcomes = OutcomeDistribution.simulate(2_000_000, seed=1)
+    result = simulate_bankrolls(outcomes, ramp_bets([(1, 10), (3, 25)], 5), paths=100_000)
+    print(result.risk_of_ruin, result.median_time_to_double)
+
+Bets are fixed dollar amounts per true count and are not capped by the
+bankroll. A path is ruined as soon as it can no longer cover the smallest
+bet in the ramp. Drawing hands independently ignores how the count runs
+through a shoe. Results are close, not exact. Requires NumPy.
+
+    python bankroll.py --ramp 1:10,2:20,3:30,4:40 --paths 100000 --hands 5000
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+import numpy as np
+
+from analytics import unit_bet
+from history import read_history
+from counting import TC_BUCKETS, TC_MIN, tc_bucket
+from shuffle import random_seed
+from vecsim import VectorShoes
+
+STARTING_BANKROLL = 1000  # engine.STARTING_BALANCE
+NET_MIN = -2.5            # doubled loss plus a lost insurance bet
+NET_STEP = 0.5            # every result is a multiple of half a unit
+NET_VALUES = 11           # -2.5 .. +2.5
+LOOKUP_BITS = 20          # outcome probabilities are quantized to 2**-20
+BLOCK_HANDS = 100         # hands drawn per path per block
+QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+
+
+def net_index(net):
+    return int(round((net - NET_MIN) / NET_STEP))
+
+
+class OutcomeDistribution:
+    """Counts of hands per (true count bucket, net result per unit bet)"""
+
+    def __init__(self, counts=None):
+        self.counts = (np.zeros((TC_BUCKETS, NET_VALUES), dtype=np.int64)
+                       if counts is None else np.asarray(counts, dtype=np.int64))
+
+    @property
+    def hands(self):
+        return int(self.counts.sum())
+
+    @classmethod
+    def simulate(cls, n_hands, seed=None, n_shoes=10000):
+        """Distribution from the vectorized simulator (basic strategy, Hi-Lo buckets)"""
+        dist = cls()
+        shoes = VectorShoes(n_shoes, seed=seed)
+        flat = dist.counts.reshape(-1)
+        for _ in range(max(1, -(-n_hands // n_shoes))):
+            net, true_count = shoes.play_round()
+            buckets = np.clip(np.floor(true_count), TC_MIN, TC_MIN + TC_BUCKETS - 1) - TC_MIN
+            values = np.rint((net - NET_MIN) / NET_STEP)
+            cells = (buckets.astype(np.int64) * NET_VALUES + values.astype(np.int64))
+            flat += np.bincount(cells, minlength=flat.size)
+        return dist
+
+    @classmethod
+    def from_history(cls, path):
+        """Distribution of the rounds in a hand history log (any strategy or counting system)"""
+        dist = cls()
+        for record in read_history(path):
+            net = record.total_net / (unit_bet(record) or 1)
+            dist.counts[tc_bucket(record.true_count), net_index(net)] += 1
+        return dist
+
+    def mean(self, bets):
+        """Expected dollar result per hand with one bet per bucket"""
+        nets = NET_MIN + NET_STEP * np.arange(NET_VALUES)
+        return float((self.counts * np.outer(bets, nets)).sum() / self.hands)
+
+    def lookup_table(self, bets):
+        """Dollar results laid out so a uniform index of LOOKUP_BITS bits samples the joint distribution.
+
+        Cell sizes are rounded by largest remainder, so every non-empty cell
+        keeps its share to within 2**-LOOKUP_BITS.
+        """
+        size = 1 << LOOKUP_BITS
+        probs = self.counts.reshape(-1) / self.hands
+        slots = np.floor(probs * size).astype(np.int64)
+        short = size - slots.sum()
+        slots[np.argsort(slots - probs * size)[:short]] += 1
+        nets = NET_MIN + NET_STEP * np.arange(NET_VALUES)
+        dollars = (np.asarray(bets, dtype=np.float64)[:, None] * nets[None, :]).reshape(-1)
+        return np.repeat(dollars, slots).astype(np.float32)
+
+
+def ramp_bets(ramp, min_bet):
+    """Bet per true count bucket for a [(true count >=, bet)] ramp, lowest threshold first"""
+    bets = np.full(TC_BUCKETS, min_bet, dtype=np.float64)
+    for threshold, bet in ramp:
+        bets[np.arange(TC_BUCKETS) + TC_MIN >= threshold] = bet
+    return bets
+
+
+@dataclass
+class BankrollResult:
+    """Per-path ruin and doubling times (-1 = not within the horizon) and bankroll quantiles"""
+    start: float
+    hands: int
+    ruined_at: np.ndarray
+    doubled_at: np.ndarray
+    final: np.ndarray
+    checkpoints: np.ndarray   # hands played at each row of `trajectory`
+    trajectory: np.ndarray    # (len(checkpoints), len(QUANTILES)) bankroll quantiles
+    elapsed: float
+
+    @property
+    def paths(self):
+        return len(self.final)
+
+    @property
+    def risk_of_ruin(self):
+        return float((self.ruined_at >= 0).mean())
+
+    @property
+    def doubled(self):
+        return float((self.doubled_at >= 0).mean())
+
+    @property
+    def median_time_to_double(self):
+        """Median hands until the bankroll first doubles; inf when most paths never do"""
+        times = np.where(self.doubled_at >= 0, self.doubled_at, np.inf)
+        return float(np.median(times))
+
+
+def _play_paths(table, ruin_below, target, paths, hands, start, seed, record_every):
+    """One shard of paths; returns ruin and doubling times and the bankroll at every checkpoint"""
+    rng = np.random.default_rng(seed)
+    bankroll = np.full(paths, start, dtype=np.float64)
+    ruined_at = np.full(paths, -1, dtype=np.int64)
+    doubled_at = np.full(paths, -1, dtype=np.int64)
+    alive = np.arange(paths)
+    snapshots = [bankroll.astype(np.float32)]
+    played = 0
+    while played < hands:
+        block = min(BLOCK_HANDS, hands - played)
+        if len(alive):
+            # Block sums are multiples of half a dollar and small, so float32 is exact here
+            draws = rng.integers(0, 1 << LOOKUP_BITS, size=(block, len(alive)), dtype=np.uint32)
+            path = np.take(table, draws)
+            for i in range(1, block):  # row by row: much faster than cumsum along axis 0
+                path[i] += path[i - 1]
+            base = bankroll[alive]
+            cols = np.arange(len(alive))
+            broke_at = np.full(len(alive), block)
+
+            broke = path < (ruin_below - base).astype(np.float32)
+            went_broke = np.nonzero(broke.any(axis=0))[0]
+            broke_at[went_broke] = broke[:, went_broke].argmax(axis=0)
+
+            rich = path >= (target - base).astype(np.float32)
+            new = np.nonzero(rich.any(axis=0) & (doubled_at[alive] < 0))[0]
+            first_rich = rich[:, new].argmax(axis=0)
+            new_double = first_rich < broke_at[new]
+            doubled_at[alive[new[new_double]]] = played + first_rich[new_double] + 1
+
+            bankroll[alive] = base + path[np.minimum(broke_at, block - 1), cols]
+            ruined_at[alive[went_broke]] = played + broke_at[went_broke] + 1
+            alive = np.delete(alive, went_broke)
+        played += block
+        if played % record_every == 0 or played == hands:
+            snapshots.append(bankroll.astype(np.float32))
+    return ruined_at, doubled_at, np.array(snapshots)
+
+
+def simulate_bankrolls(outcomes, bets, paths=100_000, hands=5000, start=STARTING_BANKROLL,
+                       seed=None, workers=None, record_every=None):
+    """Play `paths` bankrolls for up to `hands` hands each with one bet per true count bucket.
+
+    Paths are split across `workers` processes (default: one per CPU); the
+    same seed and worker count always give the same result. Paths are played
+    in blocks of BLOCK_HANDS, so `record_every` is rounded up to a multiple
+    of it.
+    """
+    started = time.perf_counter()
+    table = outcomes.lookup_table(bets)
+    ruin_below = float(np.min(bets))
+    if record_every:
+        record_every = -(-record_every // BLOCK_HANDS) * BLOCK_HANDS  # snapshots fall on block ends
+    else:
+        record_every = max(BLOCK_HANDS, hands // 50 // BLOCK_HANDS * BLOCK_HANDS)
+    checkpoints = list(range(0, hands, record_every)) + [hands]
+    workers = max(1, min(workers or os.cpu_count() or 1, paths))
+    seeds = np.random.SeedSequence(random_seed() if seed is None else seed).spawn(workers)
+    sizes = [len(chunk) for chunk in np.array_split(np.arange(paths), workers)]
+    args = [(table, ruin_below, 2 * start, n, hands, start, s, record_every)
+            for n, s in zip(sizes, seeds)]
+
+    if workers == 1:
+        shards = [_play_paths(*args[0])]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            shards = list(pool.map(_play_paths, *zip(*args)))
+    ruined_at, doubled_at, snapshots = (np.concatenate(parts, axis=-1) for parts in zip(*shards))
+    return BankrollResult(start, hands, ruined_at, doubled_at, snapshots[-1].astype(np.float64),
+                          np.array(checkpoints), np.quantile(snapshots, QUANTILES, axis=1).T,
+                          time.perf_counter() - started)
+
+
+def parse_ramp(text):
+    """'1:10,3:25' -> [(1, 10), (3, 25)]"""
+    ramp = []
+    for step in filter(None, text.split(',')):
+        threshold, bet = step.split(':')
+        ramp.append((int(threshold), float(bet)))
+    return sorted(ramp)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Risk of ruin and bankroll trajectories for a bet ramp")
+    parser.add_argument('--ramp', default="1:10,2:20,3:30,4:40",
+                        help="true count thresholds and bets, e.g. 1:10,3:25")
+    parser.add_argument('--min-bet', type=float, default=5, help="bet below the first threshold")
+    parser.add_argument('--kelly', action='store_true',
+                        help="use the cached Kelly ramp from betting.py at the starting bankroll")
+    parser.add_argument('--bankroll', type=float, default=STARTING_BANKROLL)
+    parser.add_argument('--paths', type=int, default=100_000)
+    parser.add_argument('--hands', type=int, default=5000, help="horizon per path")
+    parser.add_argument('--sim-hands', type=int, default=2_000_000,
+                        help="simulated hands behind the outcome distribution")
+    parser.add_argument('--history', default=None,
+                        help="build the outcome distribution from this hand history log instead")
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args()
+
+    if args.kelly:
+        from betting import get_edges
+        ramp = get_edges().ramp(args.bankroll, table_min=int(args.min_bet), unit=int(args.min_bet))
+    else:
+        ramp = parse_ramp(args.ramp)
+    bets = ramp_bets(ramp, args.min_bet)
+
+    start = time.perf_counter()
+    if args.history:
+        outcomes = OutcomeDistribution.from_history(args.history)
+    else:
+        outcomes = OutcomeDistribution.simulate(args.sim_hands, seed=args.seed)
+    print(f"Outcome distribution: {outcomes.hands:,} hands in {time.perf_counter() - start:.1f}s  "
+          f"EV ${outcomes.mean(bets):+.3f}/hand")
+
+    result = simulate_bankrolls(outcomes, bets, args.paths, args.hands, args.bankroll, args.seed,
+                                args.workers)
+    ttd = result.median_time_to_double
+    print(f"{result.paths:,} paths x {result.hands:,} hands in {result.elapsed:.1f}s")
+    print(f"Risk of ruin: {result.risk_of_ruin:.2%}  Doubled: {result.doubled:.2%}  "
+          f"Median time to double: {'> horizon' if ttd == float('inf') else f'{ttd:,.0f} hands'}")
+    print(f"{'Hands':>8} " + " ".join(f"{f'p{q * 100:g}':>9}" for q in QUANTILES))
+    for hands, row in zip(result.checkpoints[::max(1, len(result.checkpoints) // 10)],
+                          result.trajectory[::max(1, len(result.checkpoints) // 10)]):
+        print(f"{hands:>8} " + " ".join(f"{value:>9,.0f}" for value in row))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,318 @@
+# bench.py
+"""Benchmark suite for regression tracking.
+
+Every benchmark reports one time per unit of work, so lower is always
+better. The reported time is the best of several repeats, which is the
+least noisy estimate. A run is saved as JSON together with metadata about
+the machine, and `compare` flags every benchmark that slowed down by more
+than a threshold between two runs:
+
+    python bench.py run -o before.json
+    ... change something ...
+    python bench.py run -o after.json
+    python bench.py compare before.json after.json --threshold 0.10
+
+The redraw benchmarks need a display. Without $DISPLAY they start a
+virtual X server (Xvfb) when one is installed. Otherwise they are recorded
+as skipped, like the NumPy benchmark when NumPy is missing.
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import socket
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+from deck import create_deck, draw_from_top, Shoe
+from engine import simulate
+from game_logic import Hand, calculate_score, is_blackjack
+from shuffle import ShuffleStream
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_THRESHOLD = 0.10  # 10% slower is a regression
+SCORE_HANDS = 20_000
+SHOES = 50
+SIM_HANDS = 50_000
+VEC_HANDS = 500_000
+REDRAWS = 200
+XVFB_DISPLAY = ":99"
+
+
+class Skip(Exception):
+    """A benchmark that cannot run here (missing display or optional dependency)"""
+
+
+def best_of(fn, repeats):
+    """Best wall time of `repeats` calls of fn, in seconds"""
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times), times
+
+
+def _realistic_hands(n, seed=0):
+    """Final player hands from dealing a shoe: hit below 17 (soft or hard), like a cautious player"""
+    rng = ShuffleStream(seed)
+    shoe = Shoe(rng=rng)
+    hands = []
+    while len(hands) < n:
+        if shoe.cut_card_reached():
+            shoe.shuffle()
+        hand = Hand([shoe.draw(), shoe.draw()])
+        while hand.score < 17:
+            hand.add(shoe.draw())
+        hands.append(hand)
+    return hands
+
+
+def bench_score_lists(repeats):
+    hands = [list(hand.cards) for hand in _realistic_hands(SCORE_HANDS)]
+
+    def run():
+        for cards in hands:
+            calculate_score(cards)
+            is_blackjack(cards)
+    best, times = best_of(run, repeats)
+    return best / len(hands) * 1e9, 'ns/hand', times
+
+
+def bench_score_hands(repeats):
+    hands = _realistic_hands(SCORE_HANDS)
+
+    def run():
+        for hand in hands:
+            calculate_score(hand)
+            is_blackjack(hand)
+    best, times = best_of(run, repeats)
+    return best / len(hands) * 1e9, 'ns/hand', times
+
+
+def bench_shoe_legacy(repeats):
+    """create_deck + shuffle + draw_from_top until the shoe is empty"""
+    rng = ShuffleStream(0)
+
+    def run():
+        for _ in range(SHOES):
+            cards = create_deck()
+            rng.shuffle(cards)
+            while cards:
+                draw_from_top(cards)
+    best, times = best_of(run, repeats)
+    return best / SHOES * 1e6, 'us/shoe', times
+
+
+def bench_shoe(repeats):
+    """Shoe.shuffle + draw through the whole shoe (the engine's path)"""
+    shoe = Shoe(rng=ShuffleStream(0))
+
+    def run():
+        for _ in range(SHOES):
+            shoe.shuffle()
+            for _ in range(len(shoe)):
+                shoe.draw()
+    best, times = best_of(run, repeats)
+    return best / SHOES * 1e6, 'us/shoe', times
+
+
+def bench_simulate(repeats):
+    best, times = best_of(lambda: simulate(SIM_HANDS, seed=1), repeats)
+    return best / SIM_HANDS * 1e6, 'us/hand', times
+
+
+def bench_simulate_vectorized(repeats):
+    try:
+        from vecsim import simulate_vectorized
+    except ImportError as exc:
+        raise Skip(f"NumPy not available ({exc})")
+    best, times = best_of(lambda: simulate_vectorized(VEC_HANDS, seed=1), repeats)
+    return best / VEC_HANDS * 1e6, 'us/hand', times
+
+
+@contextmanager
+def virtual_display():
+    """Use $DISPLAY if set, else run an Xvfb server for the duration"""
+    if os.environ.get('DISPLAY'):
+        yield
+        return
+    xvfb = shutil.which('Xvfb')
+    if xvfb is None:
+        raise Skip("no $DISPLAY and Xvfb is not installed")
+    server = subprocess.Popen([xvfb, XVFB_DISPLAY, '-screen', '0', '1280x800x24', '-nolisten', 'tcp'],
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    os.environ['DISPLAY'] = XVFB_DISPLAY
+    try:
+        time.sleep(0.5)  # let the server accept connections
+        yield
+    finally:
+        del os.environ['DISPLAY']
+        server.terminate()
+        server.wait()
+
+
+def _bench_update_ui(renderer, repeats):
+    """One full redraw: update_ui plus the idle pass that renders it, mid-round"""
+    with virtual_display():
+        import tkinter as tk
+        from deck import image_cache, warm_up_images
+        from ui import BlackjackApp
+
+        try:
+            root = tk.Tk()
+        except tk.TclError as exc:
+            raise Skip(f"cannot open a display ({exc})")
+        try:
+            app = BlackjackApp(root, preload_images=False, renderer=renderer, seed=0)
+        except BaseException:
+            image_cache.clear()
+            root.destroy()
+            raise
+        try:
+            warm_up_images()
+            engine = app.engine
+            engine.start_round(10)
+            for deal in (engine.deal_player, engine.deal_dealer, engine.deal_player, engine.deal_dealer):
+                deal()
+            root.update()
+
+            def run():
+                for i in range(REDRAWS):
+                    app.update_ui(reveal_dealer=bool(i % 2))  # alternate so every pass changes a card
+                    root.update_idletasks()
+            best, times = best_of(run, repeats)
+        finally:
+            app._on_close()  # also clears image_cache, whose PhotoImages belong to this root
+    return best / REDRAWS * 1e6, 'us/redraw', times
+
+
+def bench_update_ui_labels(repeats):
+    return _bench_update_ui('labels', repeats)
+
+
+def bench_update_ui_canvas(repeats):
+    return _bench_update_ui('canvas', repeats)
+
+
+BENCHMARKS = {
+    'score_lists': bench_score_lists,
+    'score_hands': bench_score_hands,
+    'shoe_legacy': bench_shoe_legacy,
+    'shoe': bench_shoe,
+    'simulate': bench_simulate,
+    'simulate_vectorized': bench_simulate_vectorized,
+    'update_ui_labels': bench_update_ui_labels,
+    'update_ui_canvas': bench_update_ui_canvas,
+}
+
+
+def _version(module):
+    try:
+        return __import__(module).__version__
+    except Exception:
+        return None
+
+
+def machine_metadata():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=HERE, capture_output=True,
+                                text=True).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'host': socket.gethostname(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'processor': platform.processor(),
+        'cpu_count': os.cpu_count(),
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'numpy': _version('numpy'),
+        'pillow': _version('PIL'),
+        'commit': commit,
+    }
+
+
+def run_suite(names=None, repeats=5):
+    """{'metadata': ..., 'results': {name: {'value', 'unit', 'times'} or {'skipped'}}}"""
+    results = {}
+    for name in names or BENCHMARKS:
+        try:
+            value, unit, times = BENCHMARKS[name](repeats)
+        except Skip as exc:
+            results[name] = {'skipped': str(exc)}
+            continue
+        results[name] = {'value': value, 'unit': unit, 'times': times}
+    return {'metadata': machine_metadata(), 'results': results}
+
+
+def compare(old, new, threshold=DEFAULT_THRESHOLD):
+    """[(name, old value, new value, ratio, verdict)] for benchmarks present in both runs"""
+    rows = []
+    for name, after in new['results'].items():
+        before = old['results'].get(name)
+        if not before or 'value' not in before or 'value' not in after:
+            continue
+        ratio = after['value'] / before['value']
+        verdict = ('SLOWER' if ratio > 1 + threshold else
+                   'faster' if ratio < 1 - threshold else 'same')
+        rows.append((name, before['value'], after['value'], ratio, verdict))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Blackjack benchmark suite")
+    commands = parser.add_subparsers(dest='command', required=True)
+    run_parser = commands.add_parser('run', help="run the benchmarks and save the results")
+    run_parser.add_argument('-o', '--output', default=None, help="JSON file (default: print only)")
+    run_parser.add_argument('--only', nargs='+', choices=list(BENCHMARKS), default=None)
+    run_parser.add_argument('--repeats', type=int, default=5)
+    run_parser.add_argument('--no-skip', action='store_true',
+                            help="fail if any benchmark was skipped (for CI, where Xvfb is installed)")
+    compare_parser = commands.add_parser('compare', help="flag slowdowns between two saved runs")
+    compare_parser.add_argument('old')
+    compare_parser.add_argument('new')
+    compare_parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                                help="relative slowdown that counts as a regression (0.10 = 10%%)")
+    args = parser.parse_args()
+
+    if args.command == 'run':
+        report = run_suite(args.only, args.repeats)
+        for name, result in report['results'].items():
+            if 'skipped' in result:
+                print(f"{name:<20} skipped: {result['skipped']}")
+            else:
+                print(f"{name:<20} {result['value']:>10.3f} {result['unit']}")
+        if args.output:
+            with open(args.output, 'w') as f:
+                json.dump(report, f, indent=1)
+            print(f"Saved to {args.output}")
+        skipped = [name for name, result in report['results'].items() if 'skipped' in result]
+        if args.no_skip and skipped:
+            sys.exit(f"skipped: {', '.join(skipped)}")
+        return
+
+    with open(args.old) as f:
+        old = json.load(f)
+    with open(args.new) as f:
+        new = json.load(f)
+    for key in ('host', 'machine', 'python'):
+        if old['metadata'].get(key) != new['metadata'].get(key):
+            print(f"warning: runs differ in {key}: {old['metadata'].get(key)} vs "
+                  f"{new['metadata'].get(key)}")
+    rows = compare(old, new, args.threshold)
+    for name, before, after, ratio, verdict in rows:
+        print(f"{name:<20} {before:>10.3f} -> {after:>10.3f}  {ratio - 1:+7.1%}  {verdict}")
+    regressions = [row[0] for row in rows if row[4] == 'SLOWER']
+    if regressions:
+        sys.exit(f"{len(regressions)} regression(s) beyond {args.threshold:.0%}: {', '.join(regressions)}")
+
+
+if __name__ == "__main__":
+    main()
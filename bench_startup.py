@@ -0,0 +1,141 @@
+# bench_startup.py
+"""Startup and import timing.
+
+Every measurement runs in a fresh interpreter, so module caches and
+already-imported packages never flatter the numbers. Times are milliseconds
+from just before the process is spawned:
+
+    imported     the GUI modules are loaded (main.py's imports)
+    window       the window is mapped and its first paint has been processed
+    first_card   the first round's cards have been drawn
+
+The game runs in turbo mode with a fixed seed, so `first_card` measures
+loading and drawing rather than the deal animation. The import check loads
+each headless entry point on its own. It fails if any of them pulls in
+tkinter or PIL.
+
+    python bench_startup.py --runs 5 --renderer canvas
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+HEADLESS_MODULES = ('engine', 'strategy', 'counting', 'history', 'analytics', 'runner',
+                    'betting', 'ev', 'vecsim', 'bankroll')
+GUI_ONLY_MODULES = ('tkinter', 'PIL')
+STARTUP_MARKS = ('imported', 'window', 'first_card')
+
+_IMPORT_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = (time.perf_counter() - start) * 1000
+print(json.dumps({{'ms': elapsed, 'gui_modules': [m for m in {gui!r} if m in sys.modules]}}))
+"""
+
+
+def _run_child(args):
+    result = subprocess.run([sys.executable] + args, cwd=HERE, capture_output=True, text=True)
+    if result.returncode:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr else
+                           f"exit status {result.returncode}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def measure_imports(modules=HEADLESS_MODULES, runs=3):
+    """{module: {'ms': median import time, 'gui_modules': [tkinter/PIL if imported]}}
+
+    Modules whose optional dependency is missing (e.g. NumPy) get 'error'.
+    """
+    report = {}
+    for module in modules:
+        probe = _IMPORT_PROBE.format(module=module, gui=GUI_ONLY_MODULES)
+        try:
+            samples = [_run_child(['-c', probe]) for _ in range(runs)]
+        except RuntimeError as exc:
+            report[module] = {'error': str(exc)}
+            continue
+        report[module] = {'ms': statistics.median(s['ms'] for s in samples),
+                          'gui_modules': samples[0]['gui_modules']}
+    return report
+
+
+def measure_startup(runs=5, renderer='labels'):
+    """{mark: median ms from spawn} over `runs` fresh GUI processes (needs a display)"""
+    samples = []
+    for _ in range(runs):
+        start = time.time()
+        marks = _run_child([os.path.join(HERE, 'bench_startup.py'), '--child', renderer])
+        samples.append({mark: (marks[mark] - start) * 1000 for mark in STARTUP_MARKS})
+    return {mark: statistics.median(s[mark] for s in samples) for mark in STARTUP_MARKS}
+
+
+def _child(renderer):
+    """One timed startup, as main.py does it; prints the wall-clock time of each mark"""
+    import tkinter as tk
+    from main import create_app, parse_args
+
+    marks = {'imported': time.time()}
+    root = tk.Tk()
+    app = create_app(root, parse_args(['--renderer', renderer, '--turbo', '--seed', '0']))
+
+    def painted():
+        root.wait_visibility()
+        root.update_idletasks()
+        marks['window'] = time.time()
+        app.quick_bet(10)
+        root.after(1, dealt)
+
+    def dealt():
+        if not app.player_row.cards:
+            root.after(1, dealt)
+            return
+        root.update_idletasks()
+        marks['first_card'] = time.time()
+        app._on_close()
+
+    root.after(0, painted)
+    root.mainloop()
+    print(json.dumps(marks))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Startup and import timing in fresh processes")
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--renderer', choices=('labels', 'canvas'), default='labels')
+    parser.add_argument('--imports-only', action='store_true', help="skip the GUI startup runs")
+    parser.add_argument('--json', action='store_true', help="print the results as JSON")
+    parser.add_argument('--child', default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        _child(args.child)
+        return
+
+    results = {'imports': measure_imports(runs=args.runs)}
+    if not args.imports_only:
+        results['startup'] = measure_startup(args.runs, args.renderer)
+    leaks = [m for m, r in results['imports'].items() if r.get('gui_modules')]
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        for module, result in results['imports'].items():
+            if 'error' in result:
+                print(f"import {module:<10} skipped: {result['error']}")
+            else:
+                extra = f"  loads {', '.join(result['gui_modules'])}!" if result['gui_modules'] else ""
+                print(f"import {module:<10} {result['ms']:7.1f} ms{extra}")
+        for mark, ms in results.get('startup', {}).items():
+            print(f"{args.renderer} {mark:<10} {ms:7.1f} ms")
+    if leaks:
+        sys.exit(f"headless modules import GUI packages: {', '.join(leaks)}")
+
+
+if __name__ == "__main__":
+    main()
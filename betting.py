@@ -0,0 +1,218 @@
+# betting.py
+"""Kelly bet ramps from simulated edge and variance per true count.
+
+`estimate_edges` plays a large simulation under one RuleConfig and keeps
+the per-true-count buckets from runner. The edge is a hands-weighted
+straight line through the well-sampled buckets, because the raw bucket
+means at high counts are too noisy to bet on. Each bucket keeps its own
+variance, and sparse buckets fall back to the pooled variance. Kelly then
+bets the fraction edge / variance of the bankroll.
+
+Simulations are slow, so tables are cached on disk under a key of the rule
+config. The GUI only ever reads that cache. A continuous shuffler resets
+the count every round, so every hand has a true count of 0 and there is
+nothing to ramp: CSM rules get no table, and bets stay flat at the table
+minimum (`flat_bet`).
+
+    python betting.py --hands 5000000 --bankroll 1000 --min 5 --max 500
+"""
+import argparse
+import hashlib
+import json
+import os
+from dataclasses import asdict, dataclass
+
+from counting import DEFAULT_SYSTEM, TC_BUCKETS, TC_MAX, TC_MIN
+from deck import NUM_DECKS
+from engine import DEALER_STANDS_ON
+from shuffle import DEFAULT_PENETRATION
+
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "blackjack")
+DEFAULT_HANDS = 2_000_000
+MIN_BUCKET_HANDS = 1000  # buckets with fewer hands do not shape the edge line
+TABLE_MIN = 5
+TABLE_MAX = 500
+KELLY_FRACTION = 0.5     # half Kelly: 3/4 of the growth for half the swings
+
+
+@dataclass(frozen=True)
+class RuleConfig:
+    """Everything that changes edge or variance by true count; the cache key"""
+    num_decks: int = NUM_DECKS
+    penetration: float = DEFAULT_PENETRATION
+    csm: bool = False
+    count_system: str = DEFAULT_SYSTEM
+    dealer_stands_on: int = DEALER_STANDS_ON
+    blackjack_payout: float = 1.5
+
+    @classmethod
+    def from_engine(cls, engine):
+        return cls(num_decks=engine.num_decks, penetration=engine.penetration, csm=engine.csm,
+                   count_system=engine.count_system)
+
+    def engine_options(self):
+        """BlackjackEngine keyword arguments (the other rules are fixed in engine.py)"""
+        return {'penetration': self.penetration, 'csm': self.csm, 'count_system': self.count_system}
+
+    def key(self):
+        text = json.dumps(asdict(self), sort_keys=True)
+        return hashlib.blake2b(text.encode(), digest_size=8).hexdigest()
+
+
+class EdgeTable:
+    """Edge and variance per true count bucket, per unit of initial bet"""
+
+    def __init__(self, hands, evs, variances):
+        self.hands = list(hands)
+        self.evs = list(evs)
+        self.variances = list(variances)
+        total = sum(self.hands)
+        self.pooled_variance = (sum(n * v for n, v in zip(self.hands, self.variances)) / total
+                                if total else 1.0)
+        self.intercept, self.slope = self._fit()
+
+    @classmethod
+    def from_summary(cls, summary):
+        """Table from the buckets of a runner.SimulationSummary"""
+        evs, variances = [], []
+        for n, total, total_sq in zip(summary.bucket_hands, summary.bucket_total,
+                                      summary.bucket_total_sq):
+            mean = total / n if n else 0.0
+            evs.append(mean)
+            variances.append((total_sq - n * mean * mean) / (n - 1) if n > 1 else 0.0)
+        return cls(summary.bucket_hands, evs, variances)
+
+    def _fit(self):
+        """Hands-weighted least squares edge = intercept + slope * true count"""
+        points = [(TC_MIN + i + 0.5, ev, n)
+                  for i, (n, ev) in enumerate(zip(self.hands, self.evs)) if n >= MIN_BUCKET_HANDS]
+        weight = sum(n for _, _, n in points)
+        if len(points) < 2:
+            return (points[0][1] if points else 0.0), 0.0
+        mean_x = sum(x * n for x, _, n in points) / weight
+        mean_y = sum(y * n for _, y, n in points) / weight
+        sxx = sum(n * (x - mean_x) ** 2 for x, _, n in points)
+        sxy = sum(n * (x - mean_x) * (y - mean_y) for x, y, n in points)
+        slope = sxy / sxx if sxx else 0.0
+        return mean_y - slope * mean_x, slope
+
+    def edge(self, true_count):
+        """Expected win per unit bet at a true count"""
+        return self.intercept + self.slope * true_count
+
+    def variance(self, true_count):
+        i = min(max(int(true_count // 1), TC_MIN), TC_MAX) - TC_MIN
+        return self.variances[i] if self.hands[i] >= MIN_BUCKET_HANDS else self.pooled_variance
+
+    def bet(self, bankroll, true_count, table_min=TABLE_MIN, table_max=TABLE_MAX,
+            kelly_fraction=KELLY_FRACTION, unit=TABLE_MIN):
+        """Fractional Kelly bet in whole units, clamped to the table limits and the bankroll"""
+        if bankroll < table_min:
+            return 0
+        edge = self.edge(true_count)
+        if edge <= 0:
+            return table_min
+        amount = bankroll * kelly_fraction * edge / self.variance(true_count)
+        amount = int(amount // unit) * unit
+        return min(max(amount, table_min), table_max, int(bankroll))
+
+    def ramp(self, bankroll, table_min=TABLE_MIN, table_max=TABLE_MAX,
+             kelly_fraction=KELLY_FRACTION, unit=TABLE_MIN):
+        """[(true count, bet)] for every bucket, at the start of each count"""
+        return [(tc, self.bet(bankroll, tc, table_min, table_max, kelly_fraction, unit))
+                for tc in range(TC_MIN, TC_MAX + 1)]
+
+    def to_dict(self):
+        return {'hands': self.hands, 'evs': self.evs, 'variances': self.variances}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data['hands'], data['evs'], data['variances'])
+
+
+def flat_bet(bankroll, table_min=TABLE_MIN):
+    """The bet when the count carries no information (CSM): the table minimum, if affordable"""
+    return table_min if bankroll >= table_min else 0
+
+
+def estimate_edges(rules=RuleConfig(), n_hands=DEFAULT_HANDS, seed=0, workers=None):
+    """Simulate n_hands of basic strategy under `rules` and tabulate the buckets"""
+    if rules.csm:
+        raise ValueError("a continuous shuffler resets the count every round; "
+                         "there is no count ramp (use flat_bet)")
+    from runner import run  # process pool machinery; the GUI only reads cached tables
+    report = run(n_hands, workers, seed, engine_options=rules.engine_options())
+    return EdgeTable.from_summary(report.summary)
+
+
+def cache_path(rules):
+    return os.path.join(CACHE_DIR, f"ramp-{rules.key()}.json")
+
+
+def load_edges(rules=RuleConfig()):
+    """Cached EdgeTable for the rules, or None when nothing has been simulated yet (or CSM)"""
+    if rules.csm:
+        return None
+    try:
+        with open(cache_path(rules)) as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if len(data.get('table', {}).get('hands', ())) != TC_BUCKETS:
+        return None  # written with other buckets
+    return EdgeTable.from_dict(data['table'])
+
+
+def save_edges(rules, table):
+    path = cache_path(rules)
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({'rules': asdict(rules), 'table': table.to_dict()}, f)
+    os.replace(tmp_path, path)
+
+
+def get_edges(rules=RuleConfig(), n_hands=DEFAULT_HANDS, seed=0, workers=None):
+    """Cached table for the rules, simulated and saved on a miss"""
+    table = load_edges(rules)
+    if table is None:
+        table = estimate_edges(rules, n_hands, seed, workers)
+        save_edges(rules, table)
+    return table
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Kelly bet ramp from a simulation (cached)")
+    parser.add_argument('--hands', type=int, default=DEFAULT_HANDS)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--penetration', type=float, default=DEFAULT_PENETRATION)
+    parser.add_argument('--csm', action='store_true')
+    parser.add_argument('--count-system', default=DEFAULT_SYSTEM)
+    parser.add_argument('--bankroll', type=float, default=1000)
+    parser.add_argument('--min', type=int, default=TABLE_MIN, dest='table_min')
+    parser.add_argument('--max', type=int, default=TABLE_MAX, dest='table_max')
+    parser.add_argument('--kelly', type=float, default=KELLY_FRACTION, help="Kelly fraction")
+    parser.add_argument('--rescan', action='store_true', help="simulate even if a table is cached")
+    args = parser.parse_args()
+
+    rules = RuleConfig(penetration=args.penetration, csm=args.csm, count_system=args.count_system)
+    if rules.csm:
+        print(f"CSM: the count resets every round, so there is no ramp. "
+              f"Bet flat ${flat_bet(args.bankroll, args.table_min)}.")
+        return
+    if args.rescan:
+        table = estimate_edges(rules, args.hands, args.seed, args.workers)
+        save_edges(rules, table)
+    else:
+        table = get_edges(rules, args.hands, args.seed, args.workers)
+    print(f"Rules: {rules}")
+    print(f"Edge: {table.intercept:+.4f} {table.slope:+.4f} * TC  "
+          f"pooled variance: {table.pooled_variance:.3f}")
+    for tc, amount in table.ramp(args.bankroll, args.table_min, args.table_max, args.kelly):
+        i = tc - TC_MIN
+        print(f"  TC {tc:+d}: {table.hands[i]:>9} hands  edge {table.edge(tc):+.4f}  bet ${amount}")
+
+
+if __name__ == "__main__":
+    main()
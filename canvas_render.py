@@ -0,0 +1,176 @@
+import time
+import tkinter as tk
+from collections import deque
+
+FRAME_MS = 16        # ~60 fps animation ticks
+SLIDE_MS = 250       # time for a dealt card to travel from the shoe
+FRAME_SAMPLES = 600  # frame times kept for comparison with the Label layout
+
+
+class CanvasText:
+    """A canvas text item with the Label methods the app uses (config/cget)"""
+
+    def __init__(self, canvas, x, y, text="", fg='white', font=None, anchor=tk.CENTER):
+        self.canvas = canvas
+        self.item = canvas.create_text(x, y, text=text, fill=fg, font=font, anchor=anchor,
+                                       justify=tk.CENTER)
+
+    def config(self, text=None, fg=None, **_):
+        options = {}
+        if text is not None:
+            options['text'] = text
+        if fg is not None:
+            options['fill'] = fg
+        self.canvas.itemconfig(self.item, **options)
+
+    configure = config
+
+    def cget(self, key):
+        return self.canvas.itemcget(self.item, 'fill' if key == 'fg' else key)
+
+
+class CanvasTable:
+    """The whole game table drawn on one Canvas.
+
+    Card sprites are canvas items taken from a pool and hidden (not deleted)
+    when no longer needed, so dealing never creates widgets. New cards slide
+    in from the shoe with frame-paced coordinate updates.
+    """
+
+    def __init__(self, parent, bg, width, height, shoe_position):
+        self.canvas = tk.Canvas(parent, bg=bg, width=width, height=height, highlightthickness=0)
+        self.canvas.pack(fill='both', expand=True)
+        self.shoe_position = shoe_position
+        self._pool = {'image': [], 'text': []}
+        self._moves = {}  # item -> (start_xy, end_xy, start_time)
+        self._ticking = False
+        self.items_created = 0
+        self.frame_times = deque(maxlen=FRAME_SAMPLES)
+
+    def text(self, x, y, text="", fg='white', font=None, anchor=tk.CENTER):
+        return CanvasText(self.canvas, x, y, text, fg, font, anchor)
+
+    def card_row(self, x, y, spacing, image_for, fallback_for, animate=True):
+        return CanvasCardRow(self, x, y, spacing, image_for, fallback_for, animate)
+
+    # Sprite pool
+    def acquire(self, kind):
+        """Take a hidden item of `kind` ('image' or 'text') from the pool, creating one if empty"""
+        pool = self._pool[kind]
+        if pool:
+            item = pool.pop()
+            self.canvas.itemconfig(item, state='normal')
+            self.canvas.tag_raise(item)
+            return item
+        self.items_created += 1
+        if kind == 'image':
+            return self.canvas.create_image(0, 0, anchor=tk.NW)
+        return self.canvas.create_text(0, 0, anchor=tk.NW, width=70, justify=tk.CENTER)
+
+    def release(self, item, kind):
+        self._moves.pop(item, None)
+        self.canvas.itemconfig(item, state='hidden')
+        self._pool[kind].append(item)
+
+    # Animation
+    def place(self, item, x, y, animate):
+        if animate:
+            self._moves[item] = (self.shoe_position, (x, y), time.perf_counter())
+            self.canvas.coords(item, *self.shoe_position)
+            if not self._ticking:
+                self._ticking = True
+                self.canvas.after(FRAME_MS, self._tick)
+        else:
+            self._moves.pop(item, None)
+            self.canvas.coords(item, x, y)
+
+    def _tick(self):
+        """Advance every sliding card one frame"""
+        frame_start = time.perf_counter()
+        done = []
+        for item, ((x0, y0), (x1, y1), started) in self._moves.items():
+            t = min((frame_start - started) * 1000 / SLIDE_MS, 1.0)
+            t = 1 - (1 - t) ** 3  # ease-out
+            self.canvas.coords(item, x0 + (x1 - x0) * t, y0 + (y1 - y0) * t)
+            if t >= 1.0:
+                done.append(item)
+        for item in done:
+            del self._moves[item]
+        self.frame_times.append(time.perf_counter() - frame_start)
+
+        if self._moves:
+            self.canvas.after(FRAME_MS, self._tick)
+        else:
+            self._ticking = False
+
+
+class CanvasCardRow:
+    """Same interface as render.CardRow, drawn with pooled canvas items"""
+
+    def __init__(self, table, x, y, spacing, image_for, fallback_for, animate=True):
+        self.table = table
+        self.x = x
+        self.y = y
+        self.spacing = spacing
+        self.image_for = image_for
+        self.fallback_for = fallback_for
+        self.animate = animate
+        self.cards = []
+        self.sprites = []  # (item, kind)
+        self.images = []   # keep PhotoImages alive while shown
+
+    def render(self, cards):
+        cards = list(cards)
+        while len(self.sprites) > len(cards):
+            item, kind = self.sprites.pop()
+            self.table.release(item, kind)
+            self.images.pop()
+            self.cards.pop()
+
+        for i, card in enumerate(cards):
+            if i >= len(self.cards):
+                self._append(i, card)
+            elif self.cards[i] != card:
+                self._swap(i, card)
+        self.cards = cards
+
+    def clear(self):
+        self.render([])
+
+    def refresh(self):
+        """Replace text fallbacks with images that have become available (e.g. after preloading)"""
+        for i, card in enumerate(self.cards):
+            if self.images[i] is None and self.image_for(card):
+                self._swap(i, card)
+
+    def _show(self, card):
+        """Acquire and configure a sprite for card; return (item, kind, image)"""
+        canvas = self.table.canvas
+        img = self.image_for(card)
+        if img:
+            item = self.table.acquire('image')
+            canvas.itemconfig(item, image=img)
+            return item, 'image', img
+        item = self.table.acquire('text')
+        canvas.itemconfig(item, text=self.fallback_for(card).get('text', ''), fill='white')
+        return item, 'text', None
+
+    def _append(self, i, card):
+        item, kind, img = self._show(card)
+        self.table.place(item, self.x + i * self.spacing, self.y, self.animate)
+        self.sprites.append((item, kind))
+        self.images.append(img)
+        self.cards.append(card)
+
+    def _swap(self, i, card):
+        old_item, old_kind = self.sprites[i]
+        img = self.image_for(card)
+        if img and old_kind == 'image':
+            self.table.canvas.itemconfig(old_item, image=img)
+        else:
+            self.table.release(old_item, old_kind)
+            item, kind, img = self._show(card)
+            self.table.place(item, self.x + i * self.spacing, self.y, False)
+            self.sprites[i] = (item, kind)
+        self.images[i] = img
+        self.cards[i] = card
@@ -0,0 +1,126 @@
+# counting.py
+"""Card counting systems as per-rank tag tables.
+
+A CountTracker keeps a single array of cards seen per rank: recording a
+card is one indexed add no matter how many systems are followed. Running
+counts, true counts and ace side counts for every system are derived from
+that array when asked for, so the GUI panel and the simulator can switch
+between or compare systems without replaying the shoe.
+"""
+from dataclasses import dataclass
+
+from deck import ACE_RANK, CARD_RANK, NUM_DECKS, ranks, suits
+
+CARDS_PER_RANK = len(suits)  # per deck
+
+
+@dataclass(frozen=True)
+class CountingSystem:
+    """Tags by rank_index (2..10, J, Q, K, A).
+
+    Unbalanced systems start from an initial running count of
+    `irc_offset + irc_per_deck * decks` and convert to a true count through
+    their pivot. Ace-neutral systems can keep an ace side count: each ace
+    left above the expected share adds `ace_side_weight` to the count used
+    for betting.
+    """
+    name: str
+    tags: tuple
+    irc_offset: int = 0
+    irc_per_deck: int = 0
+    pivot: int = 0
+    ace_side_weight: int = 0
+
+    @property
+    def balanced(self):
+        return sum(self.tags) == 0
+
+    @property
+    def level(self):
+        return max(abs(tag) for tag in self.tags)
+
+    def initial_count(self, num_decks):
+        return self.irc_offset + self.irc_per_deck * num_decks
+
+
+#                        2  3  4  5  6  7  8  9 10  J  Q  K  A
+HI_LO = CountingSystem("Hi-Lo", (1, 1, 1, 1, 1, 0, 0, 0, -1, -1, -1, -1, -1))
+KO = CountingSystem("KO", (1, 1, 1, 1, 1, 1, 0, 0, -1, -1, -1, -1, -1),
+                    irc_offset=4, irc_per_deck=-4, pivot=4)
+HI_OPT_II = CountingSystem("Hi-Opt II", (1, 1, 2, 2, 1, 1, 0, 0, -2, -2, -2, -2, 0),
+                           ace_side_weight=2)
+OMEGA_II = CountingSystem("Omega II", (1, 1, 2, 2, 2, 1, 0, -1, -2, -2, -2, -2, 0),
+                          ace_side_weight=2)
+ZEN = CountingSystem("Zen", (1, 1, 2, 2, 2, 1, 0, 0, -2, -2, -2, -2, -1))
+
+SYSTEMS = {system.name: system for system in (HI_LO, KO, HI_OPT_II, OMEGA_II, ZEN)}
+DEFAULT_SYSTEM = HI_LO.name
+
+MIN_DECKS_REMAINING = 0.5  # true count divisor floor, as in BlackjackEngine
+
+# True-count buckets for per-count statistics: floor(tc) clipped to [TC_MIN, TC_MAX]
+TC_MIN = -10
+TC_MAX = 10
+TC_BUCKETS = TC_MAX - TC_MIN + 1
+
+
+def tc_bucket(true_count):
+    """Bucket index for a true count"""
+    return min(max(int(true_count // 1), TC_MIN), TC_MAX) - TC_MIN
+
+
+class CountTracker:
+    """Cards seen per rank, with counts for any number of systems derived on demand"""
+
+    def __init__(self, num_decks=NUM_DECKS, systems=None):
+        self.num_decks = num_decks
+        self.systems = dict(SYSTEMS if systems is None else systems)
+        self.seen = [0] * len(ranks)
+        self.cards_seen = 0
+
+    def add(self, card):
+        self.seen[CARD_RANK[card]] += 1
+        self.cards_seen += 1
+
+    def reset(self):
+        self.seen[:] = [0] * len(ranks)
+        self.cards_seen = 0
+
+    def running_count(self, name=DEFAULT_SYSTEM):
+        system = self.systems[name]
+        return system.initial_count(self.num_decks) + sum(
+            tag * count for tag, count in zip(system.tags, self.seen) if tag)
+
+    def aces_remaining(self):
+        return CARDS_PER_RANK * self.num_decks - self.seen[ACE_RANK]
+
+    def ace_surplus(self, decks_remaining):
+        """Aces left beyond the share expected in `decks_remaining` decks (negative when ace-poor)"""
+        return self.aces_remaining() - CARDS_PER_RANK * decks_remaining
+
+    def betting_count(self, name, decks_remaining):
+        """Running count adjusted by the ace side count, if the system keeps one"""
+        system = self.systems[name]
+        count = self.running_count(name)
+        if system.ace_side_weight:
+            count += system.ace_side_weight * self.ace_surplus(decks_remaining)
+        return count
+
+    def true_count(self, name=DEFAULT_SYSTEM, decks_remaining=NUM_DECKS):
+        """True count in the system's own units (level-2 counts run about twice Hi-Lo)"""
+        system = self.systems[name]
+        count = self.betting_count(name, decks_remaining)
+        decks = max(decks_remaining, MIN_DECKS_REMAINING)
+        if system.balanced:
+            return count / decks
+        # Unbalanced: the running count equals the true count at the pivot
+        return system.pivot + (count - system.pivot) / decks
+
+    def normalized_true_count(self, name, decks_remaining):
+        """True count on a level-1 (Hi-Lo like) scale, for shared bet ramps and thresholds"""
+        return self.true_count(name, decks_remaining) / self.systems[name].level
+
+    def true_counts(self, decks_remaining, normalized=True):
+        """{system name: true count} for every tracked system"""
+        convert = self.normalized_true_count if normalized else self.true_count
+        return {name: convert(name, decks_remaining) for name in self.systems}
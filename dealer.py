@@ -0,0 +1,101 @@
+# dealer.py
+"""Exact dealer outcome probabilities for a given shoe composition.
+
+The dealer's final total (17-21, bust, or a natural blackjack) is computed
+by recursion over the remaining composition, with every intermediate state
+memoized in a bounded LRU cache keyed on the composition vector. Queries
+within the same shoe share most of their sub-states, so repeated calls on
+every deal are cheap. The dealer stands on all 17s and does not peek, as in
+BlackjackEngine.
+"""
+from functools import lru_cache
+
+from deck import CARD_HARD_VALUE
+from engine import DEALER_STANDS_ON
+
+# Outcome vector layout returned by dealer_probabilities
+OUTCOMES = ('17', '18', '19', '20', '21', 'bust', 'blackjack')
+BUST_INDEX = 5
+BLACKJACK_INDEX = 6
+
+# Composition vectors count cards by hard value: index 0 = ace, 1..9 = 2..10
+NUM_VALUES = 10
+CACHE_SIZE = 200_000
+
+def composition_of(cards):
+    """Composition vector (counts of A, 2..9, 10-valued) for a list of card ids"""
+    counts = [0] * NUM_VALUES
+    for card in cards:
+        counts[CARD_HARD_VALUE[card] - 1] += 1
+    return tuple(counts)
+
+
+def value_index(card):
+    """Composition index of a card id"""
+    return CARD_HARD_VALUE[card] - 1
+
+
+def _terminal(score):
+    if score > 21:
+        return tuple(1.0 if i == BUST_INDEX else 0.0 for i in range(len(OUTCOMES)))
+    return tuple(1.0 if i == score - 17 else 0.0 for i in range(len(OUTCOMES)))
+
+
+_TERMINALS = {score: _terminal(score) for score in range(17, 27)}
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _dealer_from(hard, has_ace, comp):
+    """Distribution of final outcomes for a dealer hand of hard total `hard` drawing from comp"""
+    score = hard + 10 if has_ace and hard <= 11 else hard
+    if score >= DEALER_STANDS_ON:
+        return _TERMINALS[score]
+
+    total = sum(comp)
+    if total == 0:
+        # A total under 17 has no outcome slot, so the shoe must hold enough cards to finish
+        raise ValueError(f"composition exhausted with the dealer on {score}")
+    acc = [0.0] * len(OUTCOMES)
+    for i, n in enumerate(comp):
+        if not n:
+            continue
+        p = n / total
+        sub = _dealer_from(hard + i + 1, has_ace or i == 0, comp[:i] + (n - 1,) + comp[i + 1:])
+        for k in range(len(OUTCOMES)):
+            acc[k] += p * sub[k]
+    return tuple(acc)
+
+
+def dealer_probabilities(upcard, comp):
+    """Probabilities for OUTCOMES given the dealer upcard id and the unseen composition.
+
+    `comp` must include the dealer's hole card (it is still unseen by the player)
+    but not the upcard. Raises ValueError if some sequence of draws from
+    `comp` runs out before the dealer reaches 17; the outcomes would not sum to 1.
+    """
+    up = CARD_HARD_VALUE[upcard] - 1
+    total = sum(comp)
+    acc = [0.0] * len(OUTCOMES)
+    for i, n in enumerate(comp):
+        if not n:
+            continue
+        p = n / total
+        if (up == 0 and i == 9) or (up == 9 and i == 0):
+            acc[BLACKJACK_INDEX] += p
+            continue
+        sub = _dealer_from(up + i + 2, up == 0 or i == 0, comp[:i] + (n - 1,) + comp[i + 1:])
+        for k in range(len(OUTCOMES)):
+            acc[k] += p * sub[k]
+    return tuple(acc)
+
+
+def bust_probability(upcard, comp):
+    return dealer_probabilities(upcard, comp)[BUST_INDEX]
+
+
+def cache_info():
+    return _dealer_from.cache_info()
+
+
+def clear_cache():
+    _dealer_from.cache_clear()
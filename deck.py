@@ -1,24 +1,138 @@
 # deck.py
+import json
+import mmap
 import os
-from PIL import Image, ImageTk
+import queue
+import threading
+from collections import OrderedDict
 
-CARD_DIR = os.path.join("assets", "card_images")
+from shuffle import DEFAULT_PENETRATION, ShuffleStream
+
+CARD_DIR = os.path.join("assets", "card_images")   # ảnh gốc, script.py chỉ đọc
+BUILD_DIR = os.path.join("assets", "build")         # ảnh đã xử lý, mọi kích thước (script.py)
 CARD_WIDTH = 80
 CARD_HEIGHT = 120
+THUMBNAIL_SIZE = (40, 60)
+# Hậu tố file -> kích thước mà `python script.py` xuất cho mỗi lá
+IMAGE_VARIANTS = {"": (CARD_WIDTH, CARD_HEIGHT), "@2x": (CARD_WIDTH * 2, CARD_HEIGHT * 2),
+                  "@thumb": THUMBNAIL_SIZE}
+_VARIANT_SUFFIX = {size: suffix for suffix, size in IMAGE_VARIANTS.items()}
+
+# Atlas dựng sẵn bởi `python script.py --atlas`: mọi sprite RGBA thô nằm liền nhau
+# trong một file, index JSON ghi offset của từng (lá, kích thước)
+ATLAS_PATH = os.path.join("assets", "card_atlas.rgba")
+ATLAS_INDEX_PATH = os.path.join("assets", "card_atlas.json")
+ATLAS_SIZES = list(IMAGE_VARIANTS.values())
+IMAGE_CACHE_BUDGET = 16 * 1024 * 1024  # byte RGBA tối đa giữ trong cache ảnh
+PRELOAD_WORKERS = 4      # thread decode + resize ảnh lúc khởi động
+PRELOAD_BATCH = 8        # số PhotoImage tạo trong mỗi lượt after_idle
+PRELOAD_POLL_MS = 15     # chờ thread khi chưa có ảnh nào decode xong
 
 # Configuration
 NUM_DECKS = 4  # Số bộ bài trong shoe
 
 suits = ['clubs', 'diamonds', 'hearts', 'spades']
 ranks = ['2', '3', '4', '5', '6', '7', '8', '9', '10', 'jack', 'queen', 'king', 'ace']
-single_deck_template = [f"{rank}_of_{suit}" for suit in suits for rank in ranks]
 
+# Mã hoá lá bài bằng số nguyên 0..51: card = suit_index * 13 + rank_index.
+# Mọi thông tin cần cho tính điểm/đếm bài đều tra bảng, không parse chuỗi.
+CARDS_PER_DECK = len(suits) * len(ranks)
+ACE_RANK = ranks.index('ace')
+RANK_VALUES = [2, 3, 4, 5, 6, 7, 8, 9, 10, 10, 10, 10, 11]   # theo rank_index, A = 11
+RANK_HILO = [1, 1, 1, 1, 1, 0, 0, 0, -1, -1, -1, -1, -1]     # tag Hi-Lo theo rank_index
+
+CARD_RANK = [card % len(ranks) for card in range(CARDS_PER_DECK)]
+CARD_VALUE = [RANK_VALUES[r] for r in CARD_RANK]                 # A = 11
+CARD_HARD_VALUE = [1 if r == ACE_RANK else RANK_VALUES[r] for r in CARD_RANK]  # A = 1
+CARD_IS_ACE = [r == ACE_RANK for r in CARD_RANK]
+CARD_HILO = [RANK_HILO[r] for r in CARD_RANK]
+CARD_NAMES = [f"{rank}_of_{suit}" for suit in suits for rank in ranks]
+CARD_IDS = {name: card for card, name in enumerate(CARD_NAMES)}
+
+single_deck_template = list(range(CARDS_PER_DECK))
+ALL_IMAGE_CARDS = single_deck_template + ["back"]  # 53 ảnh game cần
+
+def card_name(card):
+    """Tên file ảnh ("rank_of_suit") của một lá – chỉ dùng khi hiển thị."""
+    return CARD_NAMES[card] if isinstance(card, int) else card
+
+# Vector thành phần theo điểm cứng: index 0 = A, 1..8 = 2..9, 9 = các lá 10 điểm
+NUM_VALUES = 10
+RANK_VALUE_INDEX = [min(RANK_VALUES[r], 10) - 1 if r != ACE_RANK else 0 for r in range(len(ranks))]
+
+class Shoe:
+    """Shoe nhiều bộ: thứ tự đã shuffle + số lá còn lại theo từng rank.
+
+    Lá được rút từ cuối buffer bằng một con trỏ, không pop khỏi list; các
+    truy vấn số lá còn, penetration, số bộ còn và thành phần còn lại đều O(1).
+    Reshuffle xáo lại chính buffer đó (in-place), không tạo list mới. Thứ tự
+    chỉ phụ thuộc seed của ShuffleStream (xem shuffle.py).
+    """
+
+    def __init__(self, num_decks=NUM_DECKS, rng=None, penetration=DEFAULT_PENETRATION):
+        self.num_decks = num_decks
+        self.total_cards = CARDS_PER_DECK * num_decks
+        self.rng = rng if rng is not None else ShuffleStream()
+        self.cut_card = int(self.total_cards * penetration)  # số lá chia trước khi phải xáo
+        self._base = single_deck_template * num_decks
+        self.cards = list(self._base)                  # buffer cố định, lá trên cùng ở cuối
+        self.rank_counts = [len(suits) * num_decks] * len(ranks)
+        self._top = self.total_cards                   # số lá chưa rút = cards[:_top]
+
+    def shuffle(self):
+        """Gom lại toàn bộ lá và xáo tại chỗ (luôn xáo từ thứ tự gốc)."""
+        self.cards[:] = self._base
+        self.rng.shuffle(self.cards)
+        self._top = self.total_cards
+        self.rank_counts[:] = [len(suits) * self.num_decks] * len(ranks)
+
+    def cut_card_reached(self):
+        return self.total_cards - self._top >= self.cut_card
+
+    def return_dealt(self):
+        """Máy xáo liên tục (CSM): trả mọi lá đã chia vào shoe ở vị trí ngẫu nhiên."""
+        self.rng.insert(self.cards, self._top, self.total_cards)
+        self._top = self.total_cards
+        self.rank_counts[:] = [len(suits) * self.num_decks] * len(ranks)
+
+    def draw(self):
+        """Rút lá trên cùng; IndexError nếu shoe đã hết."""
+        if self._top == 0:
+            raise IndexError("draw from an empty shoe")
+        self._top -= 1
+        card = self.cards[self._top]
+        self.rank_counts[CARD_RANK[card]] -= 1
+        return card
+
+    def __len__(self):
+        return self._top
+
+    def remaining_cards(self):
+        """Danh sách lá chưa rút (O(n) – chỉ dùng để hiển thị/debug)."""
+        return self.cards[:self._top]
+
+    def penetration(self):
+        """Tỉ lệ lá đã chia, 0.0 .. 1.0."""
+        return 1 - self._top / self.total_cards
+
+    def decks_remaining(self):
+        return self._top / CARDS_PER_DECK
+
+    def rank_composition(self):
+        """Số lá còn lại theo rank_index (2..A)."""
+        return tuple(self.rank_counts)
+
+    def composition(self):
+        """Số lá còn lại theo điểm cứng (A, 2..9, 10) – cùng dạng với dealer.composition_of."""
+        counts = [0] * NUM_VALUES
+        for rank, count in enumerate(self.rank_counts):
+            counts[RANK_VALUE_INDEX[rank]] += count
+        return tuple(counts)
+
+# Hàm cũ trên list, giữ lại cho code/benchmark bên ngoài; game dùng Shoe
 def create_deck():
     """Trả về shoe gồm 4 bộ bài (chưa shuffle – để UI tự shuffle 1 lần)."""
-    shoe = []
-    for _ in range(NUM_DECKS):
-        shoe.extend(single_deck_template.copy())
-    return shoe
+    return single_deck_template * NUM_DECKS
 
 def draw_from_top(deck_list):
     """Lấy lá trên cùng (cuối list). Nếu deck rỗng, UI sẽ tự reshuffle."""
@@ -26,27 +140,208 @@ def draw_from_top(deck_list):
 
 def get_deck_info():
     """Trả về thông tin về số bộ bài và tổng số lá."""
-    total_cards = len(single_deck_template) * NUM_DECKS
+    total_cards = CARDS_PER_DECK * NUM_DECKS
     return {
         'num_decks': NUM_DECKS,
-        'cards_per_deck': len(single_deck_template),
+        'cards_per_deck': CARDS_PER_DECK,
         'total_cards': total_cards
     }
 
-def card_image(card_name):
-    """Ảnh kích thước chuẩn cho game."""
-    img_path = os.path.join(CARD_DIR, f"{card_name}.png")
+class ImageCache:
+    """Cache LRU (card, size) -> PhotoImage với ngân sách bộ nhớ.
+
+    Mỗi ảnh chỉ decode + resize một lần; khi tổng dung lượng RGBA ước lượng
+    vượt ngân sách thì bỏ ảnh ít dùng nhất. UI vẫn giữ tham chiếu tới ảnh
+    đang hiển thị nên ảnh bị bỏ khỏi cache không biến mất khỏi màn hình.
+    """
+
+    def __init__(self, budget_bytes=IMAGE_CACHE_BUDGET):
+        self.budget_bytes = budget_bytes
+        self.used_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._images = OrderedDict()
+        self._pending = set()      # key đang được thread decode (xem preload)
+        self._ready = queue.SimpleQueue()
+        self._generation = 0       # tăng khi clear(); lượt preload cũ tự dừng
+
+    def get(self, card, size):
+        """PhotoImage của lá; None nếu ảnh lỗi hoặc còn đang preload (UI dùng text thay thế)."""
+        key = (card_name(card), size)
+        img = self._images.get(key)
+        if img is not None or key in self._images:
+            self._images.move_to_end(key)
+            self.hits += 1
+            return img
+        if key in self._pending:
+            return None  # không chặn Tk thread chờ decode
+
+        self.misses += 1
+        img = _load_image(key[0], size)
+        self._store(key, img)
+        return img
+
+    def _store(self, key, img):
+        self._images[key] = img  # ảnh lỗi (None) cũng được nhớ để không đọc file lại
+        self.used_bytes += _image_bytes(key[1]) if img is not None else 0
+        self._evict()
+
+    @property
+    def preloading(self):
+        return bool(self._pending)
+
+    def preload(self, master, sizes=None, on_done=None, workers=PRELOAD_WORKERS):
+        """Decode + resize mọi lá trên thread pool, không chặn Tk thread.
+
+        Chỉ bước bọc PhotoImage (bắt buộc trên Tk thread) chạy trên main
+        thread, mỗi lượt after_idle PRELOAD_BATCH ảnh. Xong thì gọi on_done().
+        """
+        from concurrent.futures import ThreadPoolExecutor  # chỉ GUI cần, import muộn
+        sizes = sizes or [(CARD_WIDTH, CARD_HEIGHT), THUMBNAIL_SIZE]
+        keys = [(card_name(card), size) for size in sizes for card in ALL_IMAGE_CARDS]
+        keys = [key for key in keys if key not in self._images and key not in self._pending]
+        generation = self._generation
+        self._pending.update(keys)
+        executor = ThreadPoolExecutor(max_workers=workers)
+        for key in keys:
+            future = executor.submit(_decode_image, *key)
+            future.add_done_callback(lambda f, key=key: self._ready.put((generation, key, f)))
+        executor.shutdown(wait=False)
+        master.after_idle(self._wrap_batch, master, generation, on_done)
+
+    def _wrap_batch(self, master, generation, on_done):
+        if generation != self._generation:
+            return
+        for _ in range(PRELOAD_BATCH):
+            try:
+                item_generation, key, future = self._ready.get_nowait()
+            except queue.Empty:
+                break
+            if item_generation != generation:
+                continue
+            self._pending.discard(key)
+            try:
+                img = future.result()
+                self._store(key, _wrap_image(img) if img is not None else None)
+            except Exception:
+                self._store(key, None)
+
+        if self._pending:
+            if self._ready.empty():
+                master.after(PRELOAD_POLL_MS, self._wrap_batch, master, generation, on_done)
+            else:
+                master.after_idle(self._wrap_batch, master, generation, on_done)
+        elif on_done is not None:
+            on_done()
+
+    def _evict(self):
+        while self.used_bytes > self.budget_bytes and len(self._images) > 1:
+            (_, size), img = self._images.popitem(last=False)
+            if img is not None:
+                self.used_bytes -= _image_bytes(size)
+
+    def warm_up(self, sizes=None):
+        """Nạp trước toàn bộ 52 lá + mặt sau cho mỗi kích thước."""
+        sizes = sizes or [(CARD_WIDTH, CARD_HEIGHT), THUMBNAIL_SIZE]
+        for size in sizes:
+            for card in ALL_IMAGE_CARDS:
+                self.get(card, size)
+
+    def clear(self):
+        """Xoá cache (bắt buộc khi Tk root bị huỷ)."""
+        self._images.clear()
+        self._pending.clear()
+        self._generation += 1
+        self.used_bytes = 0
+
+    def __len__(self):
+        return len(self._images)
+
+
+def _image_bytes(size):
+    return size[0] * size[1] * 4
+
+_atlas = None  # (mmap, sprites) khi có atlas, False nếu không dùng được
+_atlas_lock = threading.Lock()  # preload mở atlas từ nhiều thread
+
+def _open_atlas():
+    """Mở atlas một lần (memory-mapped); trả về None nếu chưa build."""
+    global _atlas
+    with _atlas_lock:
+        if _atlas is None:
+            _atlas = _map_atlas()
+    return _atlas or None
+
+def _map_atlas():
     try:
-        img = Image.open(img_path).resize((CARD_WIDTH, CARD_HEIGHT))
-        return ImageTk.PhotoImage(img)
-    except Exception:
+        with open(ATLAS_INDEX_PATH) as f:
+            sprites = json.load(f)["sprites"]
+        with open(ATLAS_PATH, "rb") as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return buffer, sprites
+    except (OSError, ValueError, KeyError):
+        return False
+
+def _atlas_sprite(name, size):
+    """Cắt sprite từ atlas, không decode PNG; None nếu atlas không có."""
+    atlas = _open_atlas()
+    if atlas is None:
         return None
+    buffer, sprites = atlas
+    entry = sprites.get(name, {}).get(f"{size[0]}x{size[1]}")
+    if entry is None:
+        return None
+    from PIL import Image
+    offset, w, h = entry
+    return Image.frombuffer("RGBA", (w, h), memoryview(buffer)[offset:offset + w * h * 4],
+                            "raw", "RGBA", 0, 1)
 
-def card_thumbnail(card_name, w=40, h=60):
-    """Ảnh thumbnail dùng cho discard pile."""
-    img_path = os.path.join(CARD_DIR, f"{card_name}.png")
+def _built_image_path(name, size):
+    """File đã build đúng kích thước này, nếu có."""
+    suffix = _VARIANT_SUFFIX.get(size)
+    if suffix is None:
+        return None
+    path = os.path.join(BUILD_DIR, f"{name}{suffix}.png")
+    return path if os.path.exists(path) else None
+
+def _decode_image(name, size):
+    """Ảnh PIL đã decode đúng kích thước (không đụng tới Tk, chạy được trên thread)."""
+    from PIL import Image
+    img = _atlas_sprite(name, size)
+    if img is None:
+        built = _built_image_path(name, size)
+        if built is not None:
+            img = Image.open(built)
+        else:
+            img = Image.open(os.path.join(CARD_DIR, f"{name}.png")).resize(size)
+    img.load()
+    return img
+
+def _wrap_image(img):
+    """PhotoImage cho ảnh PIL; chỉ gọi trên Tk thread."""
+    from PIL import ImageTk  # import muộn để engine không kéo theo tkinter
+    return ImageTk.PhotoImage(img)
+
+def _load_image(name, size):
     try:
-        img = Image.open(img_path).resize((w, h))
-        return ImageTk.PhotoImage(img)
+        return _wrap_image(_decode_image(name, size))
     except Exception:
-        return None
\ No newline at end of file
+        return None
+
+image_cache = ImageCache()
+
+def warm_up_images():
+    """Nạp trước toàn bộ ảnh lá bài (gọi sau khi đã tạo Tk root)."""
+    image_cache.warm_up()
+
+def preload_card_images(master, on_done=None):
+    """Như warm_up_images nhưng chạy nền: cửa sổ hiện ngay, on_done() khi mọi ảnh đã sẵn sàng."""
+    image_cache.preload(master, on_done=on_done)
+
+def card_image(card):
+    """Ảnh kích thước chuẩn cho game (card là id 0..51 hoặc tên như "back")."""
+    return image_cache.get(card, (CARD_WIDTH, CARD_HEIGHT))
+
+def card_thumbnail(card, w=40, h=60):
+    """Ảnh thumbnail dùng cho discard pile."""
+    return image_cache.get(card, (w, h))
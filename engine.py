@@ -0,0 +1,358 @@
+# engine.py
+"""Headless Blackjack engine.
+
+Plays complete rounds with the same rules as the GUI (4-deck shoe, dealer
+stands on all 17s, blackjack pays 3:2, insurance, double down, reshuffle at
+the cut card or continuous shuffling) without importing tkinter, so rounds
+can be simulated without a display.
+"""
+import math
+from dataclasses import dataclass
+
+from counting import CountTracker, DEFAULT_SYSTEM
+from deck import Shoe, CARD_RANK, ACE_RANK
+from game_logic import Hand
+from shuffle import DEFAULT_PENETRATION, ShuffleStream
+
+# Constants
+STARTING_BALANCE = 1000
+DEALER_STANDS_ON = 17
+
+# Player actions
+HIT = 'hit'
+STAND = 'stand'
+DOUBLE = 'double'
+INSURANCE = 'insurance'
+
+# Round outcomes
+BLACKJACK = 'blackjack'
+BLACKJACK_PUSH = 'blackjack_push'
+BUST = 'bust'
+DEALER_BUST = 'dealer_bust'
+WIN = 'win'
+LOSE = 'lose'
+PUSH = 'push'
+
+
+class BlackjackEngine:
+    """Game state and rules for one seat at the table.
+
+    The GUI drives it step by step (deal, hit, dealer_hit, settle) so it can
+    animate each card; `play_round` runs a whole round in one call.
+    """
+
+    def __init__(self, balance=STARTING_BALANCE, rng=None, on_reshuffle=None,
+                 count_system=DEFAULT_SYSTEM, penetration=DEFAULT_PENETRATION, csm=False,
+                 history=None):
+        self.rng = rng if rng is not None else ShuffleStream()
+        self.on_reshuffle = on_reshuffle
+        self.history = history  # e.g. history.HistoryWriter; gets every settled round
+        self.csm = csm  # continuous shuffler: discards go back into the shoe every round
+        self.penetration = penetration  # fraction of the shoe dealt before the cut card
+
+        self.shoe = Shoe(rng=self.rng, penetration=penetration)
+        self.total_cards = self.shoe.total_cards
+        self.num_decks = self.shoe.num_decks
+
+        # Financial state
+        self.balance = balance
+        self.bet = 0
+        self.insurance_bet = 0
+
+        # Round state
+        self.can_double_down = False
+        self.can_split = False
+        self.game_in_progress = False
+        self.player_hand = Hand()
+        self.dealer_hand = Hand()
+        self.last_outcome = None
+        self.last_net = 0
+        self.insurance_net = 0
+        self.actions = []  # player decisions this round, in order
+        self.round_running_count = 0  # counts when the bet was placed
+        self.round_true_count = 0.0
+
+        # Shoe and card counting
+        self.shoe.shuffle()
+        self.discard_pile = []
+        self.counter = CountTracker(self.num_decks)
+        self.count_system = count_system
+
+    # Shoe and counting
+    def reshuffle(self):
+        """Shuffle every card back into the shoe, clearing discards and the count"""
+        self.shoe.shuffle()
+        self.discard_pile.clear()
+        self.reset_count()
+        if self.on_reshuffle is not None:
+            self.on_reshuffle()
+
+    def reset_count(self):
+        """Reset the running count of every system"""
+        self.counter.reset()
+
+    def shuffle_if_due(self):
+        """Reshuffle once the cut card has come out; only call between rounds. True if it did"""
+        if self.shoe.cut_card_reached():
+            self.reshuffle()
+            return True
+        return False
+
+    def draw_card(self):
+        """Draw card; the cut card is handled in start_round, so this only reshuffles an empty shoe"""
+        if not len(self.shoe):
+            self.reshuffle()
+
+        card = self.shoe.draw()
+        self._update_card_count(card)
+        return card
+
+    def _update_card_count(self, card):
+        """Record a seen card; every counting system reads from the same tally"""
+        self.counter.add(card)
+
+    @property
+    def running_count(self):
+        """Running count of the selected counting system"""
+        return self.counter.running_count(self.count_system)
+
+    @property
+    def cards_seen(self):
+        return self.counter.cards_seen
+
+    def decks_remaining(self):
+        """Decks left in the shoe"""
+        return self.shoe.decks_remaining()
+
+    def true_count(self):
+        """True count of the selected system on the Hi-Lo scale (running count / decks remaining)"""
+        return self.counter.normalized_true_count(self.count_system, self.decks_remaining())
+
+    # Round flow
+    def clear_round(self):
+        """Drop the current round without paying it out"""
+        self.bet = 0
+        self.insurance_bet = 0
+        self.game_in_progress = False
+        self.can_double_down = False
+        self.can_split = False
+        self.player_hand = Hand()
+        self.dealer_hand = Hand()
+
+    def reset_balance(self):
+        """Reset balance to initial amount; counting and discards restart too"""
+        self.balance = STARTING_BALANCE
+        self.reset_count()
+        self.discard_pile.clear()
+
+    def start_round(self, bet):
+        """Start a new round with empty hands (reshuffling first if the cut card is out)"""
+        self.shuffle_if_due()
+        if self.csm:
+            self.shoe.return_dealt()
+            self.discard_pile.clear()
+            self.reset_count()
+        self.round_running_count = self.running_count
+        self.round_true_count = self.true_count()
+        self.actions = []
+        self.bet = bet
+        self.game_in_progress = True
+        self.insurance_bet = 0
+        self.insurance_net = 0
+        self.can_double_down = True
+        self.can_split = False
+        self.player_hand = Hand()
+        self.dealer_hand = Hand()
+        self.last_outcome = None
+        self.last_net = 0
+
+    def deal_player(self):
+        """Deal one card to the player"""
+        card = self.draw_card()
+        self.player_hand.append(card)
+        return card
+
+    def deal_dealer(self):
+        """Deal one card to the dealer"""
+        card = self.draw_card()
+        self.dealer_hand.append(card)
+        return card
+
+    def finish_initial_deal(self):
+        """Check split possibility; return True if the round ends on a player blackjack"""
+        self.can_split = self.player_hand.is_pair
+        return self.player_hand.is_blackjack
+
+    def insurance_offered(self):
+        """Insurance is offered when the dealer shows an ace"""
+        return (self.insurance_bet == 0 and len(self.dealer_hand) >= 1
+                and CARD_RANK[self.dealer_hand[0]] == ACE_RANK)
+
+    def can_afford_insurance(self):
+        return self.bet // 2 <= self.balance - self.bet
+
+    def take_insurance(self):
+        """Place and immediately resolve the insurance bet; return True if it pays"""
+        insurance_amount = self.bet // 2
+        self.insurance_bet = insurance_amount
+        self.actions.append(INSURANCE)
+        paid = self.dealer_hand.is_blackjack
+        self.insurance_net = insurance_amount if paid else -insurance_amount
+        self.balance += self.insurance_net
+        return paid
+
+    def double_allowed(self):
+        return self.can_double_down and self.bet <= self.balance
+
+    def hit(self):
+        """Player draws one card; return the new player score"""
+        self.actions.append(HIT)
+        return self._take_card()
+
+    def double_down(self):
+        """Double the bet and draw exactly one card; return the new player score"""
+        self.bet *= 2
+        self.actions.append(DOUBLE)
+        return self._take_card()
+
+    def stand(self):
+        """Player ends the turn (a doubled hand has already ended)"""
+        if not self.actions or self.actions[-1] != DOUBLE:
+            self.actions.append(STAND)
+
+    def _take_card(self):
+        self.deal_player()
+        self.can_double_down = False
+        self.can_split = False
+        return self.player_hand.score
+
+    def player_score(self):
+        return self.player_hand.score
+
+    def dealer_score(self):
+        return self.dealer_hand.score
+
+    def dealer_should_hit(self):
+        """Dealer hits below 17 and stands on all 17s"""
+        return self.dealer_hand.score < DEALER_STANDS_ON
+
+    def settle(self):
+        """Pay out the round, move cards to the discard pile and return the outcome"""
+        player_score = self.player_hand.score
+        dealer_score = self.dealer_hand.score
+
+        if self.player_hand.is_blackjack:
+            if self.dealer_hand.is_blackjack:
+                outcome, net = BLACKJACK_PUSH, 0
+            else:
+                outcome, net = BLACKJACK, int(self.bet * 1.5)
+        elif player_score > 21:
+            outcome, net = BUST, -self.bet
+        elif dealer_score > 21:
+            outcome, net = DEALER_BUST, self.bet
+        elif player_score > dealer_score:
+            outcome, net = WIN, self.bet
+        elif player_score < dealer_score:
+            outcome, net = LOSE, -self.bet
+        else:
+            outcome, net = PUSH, 0
+
+        self.balance += net
+        self.last_outcome = outcome
+        self.last_net = net
+        self.game_in_progress = False
+        self.discard_pile.extend(self.player_hand.cards)
+        self.discard_pile.extend(self.dealer_hand.cards)
+        if self.history is not None:
+            self.history.write(self)
+        return outcome
+
+    def play_round(self, bet, strategy):
+        """Play a full round headlessly and return the net win/loss including insurance.
+
+        `strategy(engine)` returns HIT, STAND, DOUBLE or INSURANCE. DOUBLE when
+        doubling is not allowed is played as HIT; INSURANCE is only honoured
+        while it is offered.
+        """
+        self.start_round(bet)
+        self.deal_player()
+        self.deal_dealer()
+        self.deal_player()
+        self.deal_dealer()
+
+        if not self.finish_initial_deal():
+            offered = self.insurance_offered()
+            while True:
+                action = strategy(self)
+                if action == INSURANCE:
+                    if offered and self.can_afford_insurance():
+                        self.take_insurance()
+                    offered = False
+                    continue
+                offered = False
+                if action == DOUBLE and self.double_allowed():
+                    self.double_down()
+                    break
+                if action == STAND:
+                    self.stand()
+                    break
+                score = self.hit()
+                if score >= 21:
+                    if score == 21:
+                        self.stand()  # auto-stand, as in the GUI
+                    break
+
+            if not self.player_hand.is_bust:
+                while self.dealer_should_hit():
+                    self.deal_dealer()
+
+        self.settle()
+        return self.last_net + self.insurance_net
+
+
+@dataclass
+class SimulationResult:
+    """Aggregate result of `simulate`, per unit of initial bet"""
+    hands: int
+    total: float
+    total_sq: float
+
+    @property
+    def ev(self):
+        """Expected value per hand"""
+        return self.total / self.hands if self.hands else 0.0
+
+    @property
+    def variance(self):
+        """Variance of the per-hand result"""
+        if self.hands < 2:
+            return 0.0
+        mean = self.ev
+        return (self.total_sq - self.hands * mean * mean) / (self.hands - 1)
+
+    @property
+    def std(self):
+        return math.sqrt(self.variance)
+
+
+def simulate(n_hands, strategy=None, seed=None, bet=10, penetration=DEFAULT_PENETRATION, csm=False,
+             history=None):
+    """Play `n_hands` rounds with a flat bet and return EV and variance per unit bet.
+
+    The bankroll is unlimited so doubling and insurance are always affordable.
+    `history` (a history.HistoryWriter) records every round.
+    """
+    if strategy is None:
+        from strategy import basic_strategy
+        strategy = basic_strategy
+
+    engine = BlackjackEngine(balance=math.inf, rng=ShuffleStream(seed),
+                             penetration=penetration, csm=csm, history=history)
+    play_round = engine.play_round
+    total = 0.0
+    total_sq = 0.0
+    for _ in range(n_hands):
+        result = play_round(bet, strategy) / bet
+        total += result
+        total_sq += result * result
+    return SimulationResult(n_hands, total, total_sq)
@@ -0,0 +1,159 @@
+# ev.py
+"""Exact expected value of Hit, Stand and Double for the player's hand.
+
+Values are composition dependent: every card the player may draw is taken
+from the unseen composition, and the dealer's outcome distribution comes
+from `dealer.dealer_probabilities` for the composition left after those
+draws. Results are per unit bet, under the game's rules (no peek, dealer
+stands on all 17s, player stands automatically on 21).
+
+EVService runs the calculation in a worker process and keeps an LRU cache
+per (hand, upcard, composition) state so earlier states are answered
+instantly. It has no Tk dependency; the GUI polls it with `after`.
+"""
+from collections import OrderedDict
+from functools import lru_cache
+
+from dealer import dealer_probabilities, BUST_INDEX, BLACKJACK_INDEX
+from deck import CARD_HARD_VALUE, CARD_IS_ACE
+
+# Representative card id for each composition index (ace, 2..9, ten)
+_INDEX_CARD = (12, 0, 1, 2, 3, 4, 5, 6, 7, 8)
+CACHE_SIZE = 256
+
+
+def _score(hard, has_ace):
+    return hard + 10 if has_ace and hard <= 11 else hard
+
+
+@lru_cache(maxsize=100_000)
+def stand_ev(score, upcard, comp):
+    """EV of standing on `score` against the dealer upcard id"""
+    probs = dealer_probabilities(upcard, comp)
+    ev = probs[BUST_INDEX]
+    for total in range(17, 22):
+        p = probs[total - 17]
+        if total == 21:
+            p += probs[BLACKJACK_INDEX]  # no peek: a dealer natural is just 21
+        if score > total:
+            ev += p
+        elif score < total:
+            ev -= p
+    return ev
+
+
+def _draws(hard, has_ace, comp):
+    """Yield (probability, new_hard, new_has_ace, new_comp) for one card drawn from comp"""
+    total = sum(comp)
+    for i, n in enumerate(comp):
+        if n:
+            yield (n / total, hard + i + 1, has_ace or i == 0,
+                   comp[:i] + (n - 1,) + comp[i + 1:])
+
+
+@lru_cache(maxsize=100_000)
+def best_ev(hard, has_ace, upcard, comp):
+    """EV of the best of hit/stand from this hand (after the first decision)"""
+    score = _score(hard, has_ace)
+    if score > 21:
+        return -1.0
+    if score == 21:
+        return stand_ev(21, upcard, comp)
+    return max(stand_ev(score, upcard, comp), hit_ev(hard, has_ace, upcard, comp))
+
+
+@lru_cache(maxsize=100_000)
+def hit_ev(hard, has_ace, upcard, comp):
+    """EV of taking one card and then playing optimally"""
+    ev = 0.0
+    for p, new_hard, new_ace, new_comp in _draws(hard, has_ace, comp):
+        ev += p * best_ev(new_hard, new_ace, upcard, new_comp)
+    return ev
+
+
+def double_ev(hard, has_ace, upcard, comp):
+    """EV of doubling: exactly one card at twice the stake"""
+    ev = 0.0
+    for p, new_hard, new_ace, new_comp in _draws(hard, has_ace, comp):
+        score = _score(new_hard, new_ace)
+        ev += p * (-1.0 if score > 21 else stand_ev(score, upcard, new_comp))
+    return 2 * ev
+
+
+def state_key(player_cards, upcard, comp):
+    """Cache key: the player's totals, whether doubling is possible, upcard value and composition"""
+    hard = sum(CARD_HARD_VALUE[c] for c in player_cards)
+    has_ace = any(CARD_IS_ACE[c] for c in player_cards)
+    upcard = _INDEX_CARD[CARD_HARD_VALUE[upcard] - 1]
+    return hard, has_ace, len(player_cards) == 2, upcard, comp
+
+
+def action_evs(key):
+    """{'hit', 'stand', 'double'} EVs for a state_key; 'double' is None after the first card"""
+    hard, has_ace, can_double, upcard, comp = key
+    score = _score(hard, has_ace)
+    return {
+        'hit': hit_ev(hard, has_ace, upcard, comp),
+        'stand': stand_ev(score, upcard, comp),
+        'double': double_ev(hard, has_ace, upcard, comp) if can_double else None,
+    }
+
+
+class EVService:
+    """Background EV calculator with stale-request cancellation and an LRU result cache"""
+
+    def __init__(self, executor=None, cache_size=CACHE_SIZE):
+        if executor is None:
+            # Imported here: multiprocessing is slow to load and only needed once EVs are asked for
+            import multiprocessing
+            from concurrent.futures import ProcessPoolExecutor
+            # spawn: the worker must not inherit the Tk interpreter
+            executor = ProcessPoolExecutor(max_workers=1,
+                                           mp_context=multiprocessing.get_context('spawn'))
+        self._executor = executor
+        self._cache = OrderedDict()
+        self._cache_size = cache_size
+        self._pending = None  # (key, future)
+
+    def request(self, player_cards, upcard, comp):
+        """Ask for the EVs of a state; returns them at once if cached, else None.
+
+        Any earlier request still in flight is cancelled.
+        """
+        key = state_key(player_cards, upcard, comp)
+        self.cancel()
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            return self._cache[key]
+        self._pending = (key, self._executor.submit(action_evs, key))
+        return None
+
+    @property
+    def pending(self):
+        return self._pending is not None
+
+    def poll(self):
+        """Return the result of the pending request if it finished, else None"""
+        if self._pending is None:
+            return None
+        key, future = self._pending
+        if not future.done():
+            return None
+        self._pending = None
+        if future.cancelled() or future.exception() is not None:
+            return None
+        result = future.result()
+        self._cache[key] = result
+        if len(self._cache) > self._cache_size:
+            self._cache.popitem(last=False)
+        return result
+
+    def cancel(self):
+        """Forget the pending request; its result is discarded if already running"""
+        if self._pending is not None:
+            self._pending[1].cancel()
+            self._pending = None
+
+    def shutdown(self):
+        self.cancel()
+        self._executor.shutdown(wait=False)
@@ -1,17 +1,83 @@
+from deck import CARD_HARD_VALUE, CARD_IS_ACE, CARD_RANK
+
+
+class Hand:
+    """Cards held by one player, with a running hard total and ace count.
+
+    Score and the other queries are O(1), so redraws and dealer steps never
+    rescan the hand.
+    """
+    __slots__ = ('cards', 'hard_total', 'aces')
+
+    def __init__(self, cards=()):
+        self.cards = []
+        self.hard_total = 0
+        self.aces = 0
+        for card in cards:
+            self.add(card)
+
+    def add(self, card):
+        self.cards.append(card)
+        self.hard_total += CARD_HARD_VALUE[card]
+        if CARD_IS_ACE[card]:
+            self.aces += 1
+
+    append = add
+
+    @property
+    def score(self):
+        # One ace counts as 11 whenever that does not bust the hand
+        if self.aces and self.hard_total <= 11:
+            return self.hard_total + 10
+        return self.hard_total
+
+    @property
+    def is_soft(self):
+        return self.aces > 0 and self.hard_total <= 11
+
+    @property
+    def is_bust(self):
+        return self.hard_total > 21
+
+    @property
+    def is_blackjack(self):
+        return len(self.cards) == 2 and self.aces > 0 and self.hard_total == 11
+
+    @property
+    def is_pair(self):
+        return len(self.cards) == 2 and CARD_RANK[self.cards[0]] == CARD_RANK[self.cards[1]]
+
+    def __len__(self):
+        return len(self.cards)
+
+    def __iter__(self):
+        return iter(self.cards)
+
+    def __getitem__(self, index):
+        return self.cards[index]
+
+    def __repr__(self):
+        return f"Hand({self.cards!r})"
+
+
 def calculate_score(hand):
-    values = {
-        '2': 2, '3': 3, '4': 4, '5': 5, '6': 6,
-        '7': 7, '8': 8, '9': 9, '10': 10,
-        'jack': 10, 'queen': 10, 'king': 10, 'ace': 11
-    }
-    score = sum(values[card.split('_')[0]] for card in hand)
-    num_aces = sum(1 for card in hand if card.startswith('ace'))
-    
-    while score > 21 and num_aces:
-        score -= 10
-        num_aces -= 1
-    
+    if isinstance(hand, Hand):
+        return hand.score
+
+    score = 0
+    has_ace = False
+    for card in hand:
+        score += CARD_HARD_VALUE[card]
+        if CARD_IS_ACE[card]:
+            has_ace = True
+
+    # One ace counts as 11 whenever that does not bust the hand
+    if has_ace and score <= 11:
+        score += 10
+
     return score
 
 def is_blackjack(hand):
-    return calculate_score(hand) == 21 and len(hand) == 2
+    if isinstance(hand, Hand):
+        return hand.is_blackjack
+    return len(hand) == 2 and calculate_score(hand) == 21
@@ -0,0 +1,149 @@
+# history.py
+"""Append-only binary hand history.
+
+Every settled round is one record: a fixed-size header followed by the
+player's cards, the dealer's cards and the player's actions, one byte each
+(cards are the 0..51 ids from deck.py). The header holds the three lengths,
+so records need no separators and a torn record at the end of a crashed
+write is simply ignored. The GUI and the simulators write the same format
+through HistoryWriter; `read_history` streams records back with a small
+constant buffer, whatever the size of the log.
+
+    with HistoryWriter("hands.bjh") as log:
+        simulate(1_000_000, seed=1, history=log)
+    for record in read_history("hands.bjh"):
+        ...
+"""
+import struct
+from typing import NamedTuple
+
+from engine import (BLACKJACK, BLACKJACK_PUSH, BUST, DEALER_BUST, WIN, LOSE, PUSH,
+                    HIT, STAND, DOUBLE, INSURANCE)
+
+MAGIC = b"BJHIST01"
+BUFFER_SIZE = 1 << 20
+
+# Stored as the index into these tuples; append only, never reorder
+OUTCOMES = (BLACKJACK, BLACKJACK_PUSH, BUST, DEALER_BUST, WIN, LOSE, PUSH)
+ACTIONS = (HIT, STAND, DOUBLE, INSURANCE)
+_OUTCOME_CODES = {outcome: code for code, outcome in enumerate(OUTCOMES)}
+_ACTION_CODES = {action: code for code, action in enumerate(ACTIONS)}
+
+# outcome, #player cards, #dealer cards, #actions, running count, true count,
+# bet, insurance bet, net, insurance net, balance after the round
+HEADER = struct.Struct("<BBBBhfIIiid")
+
+
+class HandRecord(NamedTuple):
+    outcome: str
+    player_cards: tuple
+    dealer_cards: tuple
+    actions: tuple
+    running_count: int  # counts when the bet was placed, after any reshuffle for this round
+    true_count: float
+    bet: int
+    insurance_bet: int
+    net: int            # main bet, after doubling
+    insurance_net: int
+    balance: float      # inf for simulator runs with an unlimited bankroll
+
+    @property
+    def total_net(self):
+        return self.net + self.insurance_net
+
+    @classmethod
+    def from_engine(cls, engine):
+        """The round the engine has just settled, as it would be read back from a log"""
+        return cls(engine.last_outcome, tuple(engine.player_hand.cards),
+                   tuple(engine.dealer_hand.cards), tuple(engine.actions),
+                   engine.round_running_count, engine.round_true_count, engine.bet,
+                   engine.insurance_bet, engine.last_net, engine.insurance_net, engine.balance)
+
+
+class HistoryWriter:
+    """Buffered appender; pass it as BlackjackEngine(history=...)"""
+
+    def __init__(self, path, buffer_size=BUFFER_SIZE):
+        self.path = path
+        self._file = open(path, "ab", buffering=buffer_size)
+        if self._file.tell() == 0:
+            self._file.write(MAGIC)
+        else:
+            try:
+                _check_magic(path)
+            except ValueError:
+                self._file.close()
+                raise
+        self.records = 0
+
+    def write(self, engine):
+        """Append the round the engine has just settled"""
+        player = engine.player_hand.cards
+        dealer = engine.dealer_hand.cards
+        actions = [_ACTION_CODES[action] for action in engine.actions]
+        self._file.write(HEADER.pack(
+            _OUTCOME_CODES[engine.last_outcome], len(player), len(dealer), len(actions),
+            engine.round_running_count, engine.round_true_count,
+            engine.bet, engine.insurance_bet, engine.last_net, engine.insurance_net,
+            engine.balance) + bytes(player) + bytes(dealer) + bytes(actions))
+        self.records += 1
+
+    def flush(self):
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _check_magic(path):
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a hand history log")
+
+
+class HistoryReader:
+    """Iterates records from `offset` (a value saved from a previous reader) to the end.
+
+    After iteration `offset` points just past the last complete record, so
+    a later reader can resume from it once more rounds have been appended.
+    """
+
+    def __init__(self, path, offset=None, buffer_size=BUFFER_SIZE):
+        self.path = path
+        self.offset = len(MAGIC) if offset is None else offset
+        self.buffer_size = buffer_size
+
+    def __iter__(self):
+        _check_magic(self.path)
+        header_size = HEADER.size
+        unpack = HEADER.unpack
+        with open(self.path, "rb", buffering=self.buffer_size) as f:
+            f.seek(self.offset)
+            while True:
+                header = f.read(header_size)
+                if len(header) < header_size:
+                    return
+                (outcome, n_player, n_dealer, n_actions, running_count, true_count,
+                 bet, insurance_bet, net, insurance_net, balance) = unpack(header)
+                body_size = n_player + n_dealer + n_actions
+                body = f.read(body_size)
+                if len(body) < body_size:
+                    return  # torn write at the end of the log
+                self.offset += header_size + body_size
+                yield HandRecord(
+                    OUTCOMES[outcome],
+                    tuple(body[:n_player]),
+                    tuple(body[n_player:n_player + n_dealer]),
+                    tuple(ACTIONS[code] for code in body[n_player + n_dealer:]),
+                    running_count, true_count, bet, insurance_bet, net, insurance_net, balance)
+
+
+def read_history(path, offset=None):
+    """Generator over the records of a log"""
+    return iter(HistoryReader(path, offset))
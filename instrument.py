@@ -0,0 +1,186 @@
+# instrument.py
+"""Opt-in timers and counters for the GUI hot paths.
+
+A Profiler patches timing wrappers onto the instances it is told about. It
+patches the engine's draw and score calls, the app's update and render
+methods, the card image lookups of each row, and every callback passed to
+Tk's `after`/`after_idle`. `disable()` puts the original attributes back.
+While instrumentation is off, nothing is wrapped and the hot paths run
+exactly as before.
+
+Each name gets a Histogram of per-call latency in power-of-two microsecond
+buckets. Every render pass also records how many widgets it created and
+destroyed. `dump` writes the summary as JSON, or as CSV when the path ends
+in .csv.
+"""
+import csv
+import json
+import time
+
+US_BUCKETS = 32  # bucket b holds values in [2**(b-1), 2**b) microseconds; 0 holds < 1 us
+CSV_FIELDS = ('name', 'unit', 'count', 'total', 'mean', 'p50', 'p95', 'max')
+_MISSING = object()
+
+
+class Histogram:
+    """Count, total, max and log2 buckets of a non-negative quantity"""
+    __slots__ = ('unit', 'count', 'total', 'max', 'buckets')
+
+    def __init__(self, unit='us'):
+        self.unit = unit
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * US_BUCKETS
+
+    def add(self, value):
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+        self.buckets[min(int(value).bit_length(), US_BUCKETS - 1)] += 1
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+    def percentile(self, q):
+        """Upper edge of the bucket holding the q-quantile (capped at the max seen)"""
+        target = q * self.count
+        seen = 0
+        for b, n in enumerate(self.buckets):
+            seen += n
+            if n and seen >= target:
+                return min(float(1 << b), self.max)
+        return self.max
+
+    def summary(self):
+        return {'unit': self.unit, 'count': self.count, 'total': self.total, 'mean': self.mean,
+                'p50': self.percentile(0.5), 'p95': self.percentile(0.95), 'max': self.max}
+
+
+class Profiler:
+    """Named histograms plus the attribute patches that feed them"""
+
+    def __init__(self):
+        self.histograms = {}
+        self.enabled = False
+        self._patches = []  # (owner, attribute, original instance attribute or _MISSING)
+
+    def histogram(self, name, unit='us'):
+        hist = self.histograms.get(name)
+        if hist is None:
+            hist = self.histograms[name] = Histogram(unit)
+        return hist
+
+    def reset(self):
+        self.histograms.clear()
+
+    def timed(self, name, fn):
+        """fn wrapped to record its latency in microseconds under `name`"""
+        hist = self.histogram(name)
+        clock = time.perf_counter
+
+        def wrapper(*args, **kwargs):
+            start = clock()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                hist.add((clock() - start) * 1e6)
+        wrapper.__name__ = getattr(fn, '__name__', name)
+        return wrapper
+
+    def patch(self, owner, attribute, wrapper):
+        """Replace owner.attribute by wrapper(original) until disable()"""
+        original = owner.__dict__.get(attribute, _MISSING) if hasattr(owner, '__dict__') else _MISSING
+        setattr(owner, attribute, wrapper(getattr(owner, attribute)))
+        self._patches.append((owner, attribute, original))
+
+    def patch_timed(self, owner, attribute, name=None):
+        self.patch(owner, attribute, lambda fn: self.timed(name or attribute, fn))
+
+    def disable(self):
+        """Restore every patched attribute, newest first"""
+        for owner, attribute, original in reversed(self._patches):
+            if original is _MISSING:
+                delattr(owner, attribute)
+            else:
+                setattr(owner, attribute, original)
+        self._patches.clear()
+        self.enabled = False
+
+    def rows(self):
+        """Summaries sorted by total time (latencies first, then counts)"""
+        rows = [dict(name=name, **hist.summary()) for name, hist in self.histograms.items()
+                if hist.count]
+        return sorted(rows, key=lambda row: (row['unit'] != 'us', -row['total']))
+
+    def dump(self, path):
+        rows = self.rows()
+        with open(path, 'w', newline='') as f:
+            if path.endswith('.csv'):
+                writer = csv.DictWriter(f, fieldnames=CSV_FIELDS)
+                writer.writeheader()
+                writer.writerows(rows)
+            else:
+                for row in rows:
+                    row['buckets'] = self.histograms[row['name']].buckets
+                json.dump({'histograms': rows}, f, indent=1)
+
+
+def instrument_app(profiler, app):
+    """Patch timers onto a BlackjackApp's hot paths; undone by profiler.disable()"""
+    engine = app.engine
+    profiler.patch_timed(engine, 'draw_card')
+    profiler.patch_timed(engine, 'player_score', 'calculate_score')
+    profiler.patch_timed(engine, 'dealer_score', 'calculate_score')
+    profiler.patch_timed(app, 'update_ui')
+    profiler.patch_timed(app, 'update_discard_ui')
+    for row in (app.dealer_row, app.player_row):
+        profiler.patch_timed(row, 'image_for', 'card_image')
+    profiler.patch_timed(app.discard_row, 'image_for', 'card_thumbnail')
+    profiler.patch(app, '_render', lambda fn: _frame_counter(profiler, app, fn))
+    for method in ('after', 'after_idle'):
+        profiler.patch(app.master, method, lambda fn: _timed_after(profiler, fn))
+    profiler.enabled = True
+
+
+def _widget_counts(app):
+    created = destroyed = 0
+    for row in (app.dealer_row, app.player_row, app.discard_row):
+        created += getattr(row, 'widgets_created', 0)
+        destroyed += getattr(row, 'widgets_destroyed', 0)
+    table = getattr(app, 'table', None)
+    if table is not None:
+        created += table.items_created
+    return created, destroyed
+
+
+def _frame_counter(profiler, app, render):
+    """Time a render pass and count the widgets it created and destroyed"""
+    timed = profiler.timed('render', render)
+    created_hist = profiler.histogram('widgets created/frame', unit='count')
+    destroyed_hist = profiler.histogram('widgets destroyed/frame', unit='count')
+
+    def wrapper():
+        created, destroyed = _widget_counts(app)
+        timed()
+        now_created, now_destroyed = _widget_counts(app)
+        created_hist.add(now_created - created)
+        destroyed_hist.add(now_destroyed - destroyed)
+    wrapper.__name__ = render.__name__
+    return wrapper
+
+
+def _timed_after(profiler, after):
+    """master.after/after_idle that times each callback under 'after:<callback name>'"""
+    def wrapper(*args):
+        # after(ms, fn, *args) or after_idle(fn, *args); Scheduler events are named by their callback
+        head, rest = (args[:1], args[1:]) if args and isinstance(args[0], int) else ((), args)
+        if not rest:
+            return after(*args)
+        callback, callback_args = rest[0], rest[1:]
+        target = callback_args[1] if getattr(callback, '__name__', '') == '_fire' else callback
+        name = 'after:' + getattr(target, '__name__', type(target).__name__)
+        return after(*head, profiler.timed(name, callback), *callback_args)
+    return wrapper
@@ -1,7 +1,71 @@
+import argparse
 import tkinter as tk
-from ui import BlackjackApp
+from shuffle import DEFAULT_PENETRATION
+from ui import BlackjackApp, RENDERERS
 
-if __name__ == "__main__":
+
+def print_frame_stats(app):
+    """Print render/animation frame times so the two renderers can be compared"""
+    samples = {'render': app.frame_times}
+    if app.renderer == 'canvas':
+        samples['animation'] = app.table.frame_times
+    for name, times in samples.items():
+        if not times:
+            continue
+        ordered = sorted(times)
+        mean_ms = sum(ordered) / len(ordered) * 1000
+        p95_ms = ordered[int(len(ordered) * 0.95) - 1] * 1000
+        print(f"{app.renderer} {name} frames: {len(ordered)}  mean {mean_ms:.2f} ms  p95 {p95_ms:.2f} ms")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Enhanced Blackjack")
+    parser.add_argument("--renderer", choices=RENDERERS, default='labels',
+                        help="table renderer: Label widgets or a single Canvas")
+    parser.add_argument("--frame-stats", action="store_true",
+                        help="print frame times on exit")
+    parser.add_argument("--speed", type=float, default=1.0,
+                        help="animation speed factor (2 = twice as fast)")
+    parser.add_argument("--turbo", action="store_true",
+                        help="no delays: play rounds as fast as the engine allows")
+    parser.add_argument("--seed", type=int, default=None,
+                        help="shuffle seed: the same seed deals the same shoes")
+    parser.add_argument("--penetration", type=float, default=DEFAULT_PENETRATION,
+                        help="fraction of the shoe dealt before the cut card (default 0.75)")
+    parser.add_argument("--csm", action="store_true",
+                        help="continuous shuffler: discards return to the shoe every round")
+    parser.add_argument("--history", default=None,
+                        help="append every round to this binary hand history log")
+    parser.add_argument("--autoplay", action="store_true",
+                        help="start the basic-strategy bot with a true-count bet ramp")
+    parser.add_argument("--profile", nargs='?', const="profile.json", default=None, metavar="PATH",
+                        help="time the hot paths and dump the stats on exit (.json or .csv); "
+                             "F2 shows them live")
+    return parser.parse_args(argv)
+
+
+def create_app(root, args):
+    """The game window for parsed command line options (shared with bench_startup.py)"""
+    return BlackjackApp(root, renderer=args.renderer, speed=args.speed, turbo=args.turbo,
+                        seed=args.seed, penetration=args.penetration, csm=args.csm,
+                        history_path=args.history)
+
+
+def main(argv=None):
+    args = parse_args(argv)
     root = tk.Tk()
-    app = BlackjackApp(root)
+    app = create_app(root, args)
+    if args.profile:
+        app.enable_profiling(pinned=True)
+    if args.autoplay:
+        app.start_autoplay()
     root.mainloop()
+    if args.frame_stats:
+        print_frame_stats(app)
+    if args.profile:
+        app.profiler.dump(args.profile)
+        print(f"Profile written to {args.profile}")
+
+
+if __name__ == "__main__":
+    main()
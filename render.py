@@ -0,0 +1,84 @@
+import tkinter as tk
+
+
+class CardRow:
+    """A retained row of card Labels inside one frame.
+
+    `render(cards)` diffs the new card list against what is on screen and
+    only appends, swaps (e.g. hole-card reveal) or removes the widgets that
+    changed, instead of destroying and rebuilding the whole row.
+    """
+
+    def __init__(self, frame, image_for, fallback_for, padx=4, bg=None):
+        self.frame = frame
+        self.image_for = image_for        # card -> PhotoImage or None
+        self.fallback_for = fallback_for  # card -> Label kwargs when there is no image
+        self.padx = padx
+        self.bg = bg
+        self.cards = []
+        self.labels = []
+        self.images = []  # keep PhotoImages alive while shown
+        self.widgets_created = 0
+        self.widgets_destroyed = 0
+
+    def render(self, cards):
+        """Bring the row in line with `cards`, touching only changed positions"""
+        cards = list(cards)
+        while len(self.labels) > len(cards):
+            self._remove_last()
+
+        for i, card in enumerate(cards):
+            if i >= len(self.cards):
+                self._append(card)
+            elif self.cards[i] != card:
+                self._swap(i, card)
+        self.cards = cards
+
+    def clear(self):
+        self.render([])
+
+    def refresh(self):
+        """Replace text fallbacks with images that have become available (e.g. after preloading)"""
+        for i, card in enumerate(self.cards):
+            if self.images[i] is None and self.image_for(card):
+                self._swap(i, card)
+
+    def _make_label(self, card, before=None):
+        img = self.image_for(card)
+        if img:
+            lbl = tk.Label(self.frame, image=img, bg=self.bg)
+        else:
+            lbl = tk.Label(self.frame, **self.fallback_for(card))
+        pack_options = {'side': tk.LEFT, 'padx': self.padx}
+        if before is not None:
+            pack_options['before'] = before
+        lbl.pack(**pack_options)
+        self.widgets_created += 1
+        return lbl, img
+
+    def _append(self, card):
+        lbl, img = self._make_label(card)
+        self.labels.append(lbl)
+        self.images.append(img)
+        self.cards.append(card)
+
+    def _swap(self, i, card):
+        img = self.image_for(card)
+        if img and self.images[i]:
+            # Same kind of widget: just point it at the new image
+            self.labels[i].config(image=img)
+        else:
+            old = self.labels[i]
+            before = self.labels[i + 1] if i + 1 < len(self.labels) else None
+            lbl, img = self._make_label(card, before=before)
+            old.destroy()
+            self.widgets_destroyed += 1
+            self.labels[i] = lbl
+        self.images[i] = img
+        self.cards[i] = card
+
+    def _remove_last(self):
+        self.labels.pop().destroy()
+        self.widgets_destroyed += 1
+        self.images.pop()
+        self.cards.pop()
@@ -0,0 +1,333 @@
+# runner.py
+"""Multi-core simulation runner.
+
+Shards a simulation across a process pool. Every worker gets its own seed
+derived from one master seed, and sends back a SimulationSummary that merges
+associatively (counts, sums, sums of squares and per-true-count buckets).
+Merging happens in worker order, so the same seed and worker count always
+give bit-identical results.
+
+    python runner.py --hands 10000000 --workers 8 --seed 42
+    python runner.py --hands 200000 --compare-counts
+"""
+import argparse
+import hashlib
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+
+from counting import TC_BUCKETS, TC_MAX, TC_MIN, tc_bucket
+from dealer import value_index
+from deck import CARD_IS_ACE, CARD_VALUE
+from engine import BlackjackEngine, SimulationResult
+from history import HistoryWriter
+from shuffle import DEFAULT_PENETRATION, ShuffleStream
+
+# Stiff-hand index plays used to score playing efficiency: (hard total, dealer upcard value)
+PLAY_STATES = ((16, 10), (15, 10), (13, 2), (12, 2), (12, 3))
+MIN_PLAY_SAMPLES = 30
+
+
+def derive_seed(master_seed, index):
+    """Independent, reproducible 64-bit seed for shard `index` of a run"""
+    digest = hashlib.blake2b(f"{master_seed}:{index}".encode(), digest_size=8).digest()
+    return int.from_bytes(digest, 'little')
+
+
+@dataclass
+class SimulationSummary(SimulationResult):
+    """SimulationResult plus per-true-count buckets; merge() is associative"""
+    bucket_hands: list = field(default_factory=lambda: [0] * TC_BUCKETS)
+    bucket_total: list = field(default_factory=lambda: [0.0] * TC_BUCKETS)
+    bucket_total_sq: list = field(default_factory=lambda: [0.0] * TC_BUCKETS)
+
+    @classmethod
+    def empty(cls):
+        return cls(0, 0.0, 0.0)
+
+    def merge(self, other):
+        """Return a new summary combining self and other"""
+        return SimulationSummary(
+            self.hands + other.hands,
+            self.total + other.total,
+            self.total_sq + other.total_sq,
+            [a + b for a, b in zip(self.bucket_hands, other.bucket_hands)],
+            [a + b for a, b in zip(self.bucket_total, other.bucket_total)],
+            [a + b for a, b in zip(self.bucket_total_sq, other.bucket_total_sq)],
+        )
+
+    def bucket_ev(self):
+        """{true_count: EV per hand} for non-empty buckets"""
+        return {TC_MIN + i: self.bucket_total[i] / n
+                for i, n in enumerate(self.bucket_hands) if n}
+
+
+@dataclass
+class RunReport:
+    """Merged summary plus per-worker throughput"""
+    summary: SimulationSummary
+    workers: int
+    wall_time: float
+    worker_rates: list  # hands/sec for each worker
+
+    @property
+    def hands_per_sec(self):
+        return self.summary.hands / self.wall_time if self.wall_time else 0.0
+
+
+def run_shard(n_hands, seed, strategy=None, bet=10, history_path=None, engine_options=None):
+    """Play one shard with the scalar engine; return (summary, elapsed seconds)
+
+    `engine_options` are extra BlackjackEngine rules (penetration, csm, count_system).
+    """
+    if strategy is None:
+        from strategy import basic_strategy
+        strategy = basic_strategy
+
+    start = time.perf_counter()
+    history = HistoryWriter(history_path) if history_path else None
+    engine = BlackjackEngine(balance=float('inf'), rng=ShuffleStream(seed), history=history,
+                             **(engine_options or {}))
+    summary = SimulationSummary.empty()
+    bucket_hands = summary.bucket_hands
+    bucket_total = summary.bucket_total
+    bucket_total_sq = summary.bucket_total_sq
+    total = 0.0
+    total_sq = 0.0
+    for _ in range(n_hands):
+        engine.shuffle_if_due()  # a new shoe's first hand belongs to its own count
+        bucket = tc_bucket(engine.true_count())
+        result = engine.play_round(bet, strategy) / bet
+        total += result
+        total_sq += result * result
+        bucket_hands[bucket] += 1
+        bucket_total[bucket] += result
+        bucket_total_sq[bucket] += result * result
+    summary.hands = n_hands
+    summary.total = total
+    summary.total_sq = total_sq
+    if history is not None:
+        history.close()
+    return summary, time.perf_counter() - start
+
+
+def run_vector_shard(n_hands, seed, n_shoes=10000, penetration=DEFAULT_PENETRATION):
+    """Play one shard with the NumPy simulator; return (summary, elapsed seconds)"""
+    import numpy as np
+    from vecsim import VectorShoes
+
+    start = time.perf_counter()
+    shoes = VectorShoes(n_shoes, seed=seed, penetration=penetration)
+    n_rounds = max(1, -(-n_hands // n_shoes))
+    hands = np.zeros(TC_BUCKETS, dtype=np.int64)
+    sums = np.zeros(TC_BUCKETS)
+    sums_sq = np.zeros(TC_BUCKETS)
+    played = 0
+    for net, true_count in shoes.iter_rounds(n_rounds):
+        take = min(len(net), n_hands - played)
+        net = net[:take].astype(np.float64)
+        buckets = np.clip(np.floor(true_count[:take]), TC_MIN, TC_MAX).astype(np.int64) - TC_MIN
+        hands += np.bincount(buckets, minlength=TC_BUCKETS)
+        sums += np.bincount(buckets, weights=net, minlength=TC_BUCKETS)
+        sums_sq += np.bincount(buckets, weights=net * net, minlength=TC_BUCKETS)
+        played += take
+    summary = SimulationSummary(played, float(sums.sum()), float(sums_sq.sum()),
+                                hands.tolist(), sums.tolist(), sums_sq.tolist())
+    return summary, time.perf_counter() - start
+
+
+class _Correlation:
+    """Streaming Pearson correlation"""
+
+    def __init__(self):
+        self.n = 0
+        self.sx = self.sy = self.sxx = self.syy = self.sxy = 0.0
+
+    def add(self, x, y):
+        self.n += 1
+        self.sx += x
+        self.sy += y
+        self.sxx += x * x
+        self.syy += y * y
+        self.sxy += x * y
+
+    @property
+    def value(self):
+        if self.n < 2:
+            return 0.0
+        cov = self.sxy - self.sx * self.sy / self.n
+        var_x = self.sxx - self.sx * self.sx / self.n
+        var_y = self.syy - self.sy * self.sy / self.n
+        return cov / (var_x * var_y) ** 0.5 if var_x > 0 and var_y > 0 else 0.0
+
+
+@dataclass
+class CountComparison:
+    """How well each counting system tracks the player's edge, measured on the same shoes"""
+    hands: int
+    betting_correlation: dict    # system -> corr(true count before the deal, hand result)
+    insurance_correlation: dict  # system -> corr(true count, insurance EV) when the dealer shows an ace
+    playing_efficiency: dict     # system -> mean corr(true count, stand EV - hit-once EV) over PLAY_STATES
+    play_samples: dict           # (hard total, upcard value) -> decisions sampled
+
+
+def compare_counts(n_hands, seed=0, strategy=None, bet=10, max_play_samples=200):
+    """Play n_hands once while every counting system is tracked, and score the systems.
+
+    The engine's CountTracker follows all systems from the same cards, so
+    every system is judged on identical shoes. Playing efficiency compares
+    the count with the exact EV of standing versus hitting once, for the
+    remaining composition at each sampled stiff hand (capped at
+    max_play_samples per state; a full hit_ev can take a second per hand).
+    """
+    from ev import double_ev, stand_ev, state_key
+    if strategy is None:
+        from strategy import basic_strategy
+        strategy = basic_strategy
+
+    engine = BlackjackEngine(balance=float('inf'), rng=ShuffleStream(seed))
+    counter = engine.counter
+    names = list(counter.systems)
+    betting = {name: _Correlation() for name in names}
+    insurance = {name: _Correlation() for name in names}
+    playing = {state: {name: _Correlation() for name in names} for state in PLAY_STATES}
+    first_decision = [False]
+
+    def unseen_composition():
+        counts = list(engine.shoe.composition())
+        counts[value_index(engine.dealer_hand[1])] += 1  # the hole card is still unseen
+        return tuple(counts)
+
+    def observe(engine):
+        hand = engine.player_hand
+        upcard = engine.dealer_hand[0]
+        if first_decision[0]:
+            first_decision[0] = False
+            if CARD_IS_ACE[upcard]:
+                comp = unseen_composition()
+                insurance_ev = 3 * comp[-1] / sum(comp) - 1
+                for name, tc in counter.true_counts(engine.decks_remaining()).items():
+                    insurance[name].add(tc, insurance_ev)
+
+        state = (hand.score, CARD_VALUE[upcard])
+        if not hand.is_soft and state in playing:
+            samples = playing[state]
+            if samples[names[0]].n < max_play_samples:
+                hard, has_ace, _, ev_upcard, comp = state_key(hand.cards, upcard, unseen_composition())
+                hit_once = double_ev(hard, has_ace, ev_upcard, comp) / 2
+                gain = stand_ev(hand.score, ev_upcard, comp) - hit_once
+                for name, tc in counter.true_counts(engine.decks_remaining()).items():
+                    samples[name].add(tc, gain)
+        return strategy(engine)
+
+    for _ in range(n_hands):
+        engine.shuffle_if_due()
+        true_counts = counter.true_counts(engine.decks_remaining())
+        first_decision[0] = True
+        result = engine.play_round(bet, observe) / bet
+        for name, tc in true_counts.items():
+            betting[name].add(tc, result)
+
+    efficiency = {}
+    for name in names:
+        scores = [playing[state][name].value for state in PLAY_STATES
+                  if playing[state][name].n >= MIN_PLAY_SAMPLES]
+        efficiency[name] = sum(scores) / len(scores) if scores else 0.0
+    return CountComparison(
+        n_hands,
+        {name: c.value for name, c in betting.items()},
+        {name: c.value for name, c in insurance.items()},
+        efficiency,
+        {state: playing[state][names[0]].n for state in PLAY_STATES},
+    )
+
+
+def _shard_sizes(n_hands, shards):
+    base, extra = divmod(n_hands, shards)
+    return [base + (1 if i < extra else 0) for i in range(shards)]
+
+
+def history_paths(history, workers):
+    """Log file of each shard: `history` itself for one worker, else `history.<i>`"""
+    if not history:
+        return [None] * workers
+    if workers == 1:
+        return [history]
+    return [f"{history}.{i}" for i in range(workers)]
+
+
+def run(n_hands, workers=None, seed=0, strategy=None, vectorized=False, history=None,
+        engine_options=None):
+    """Shard n_hands across a process pool and merge the summaries in worker order.
+
+    With `history` the scalar shards also append every round to hand history
+    logs (see history_paths). The vectorized simulator only supports the
+    `penetration` engine option (Hi-Lo counting, no continuous shuffler).
+    """
+    engine_options = engine_options or {}
+    if vectorized and set(engine_options) - {'penetration'}:
+        raise ValueError("the vectorized simulator only supports the penetration option")
+    workers = workers or os.cpu_count() or 1
+    sizes = _shard_sizes(n_hands, workers)
+    seeds = [derive_seed(seed, i) for i in range(workers)]
+    paths = history_paths(history, workers)
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        if vectorized:
+            penetration = engine_options.get('penetration', DEFAULT_PENETRATION)
+            futures = [pool.submit(run_vector_shard, n, s, 10000, penetration)
+                       for n, s in zip(sizes, seeds)]
+        else:
+            futures = [pool.submit(run_shard, n, s, strategy, 10, path, engine_options)
+                       for n, s, path in zip(sizes, seeds, paths)]
+        results = [f.result() for f in futures]
+    wall_time = time.perf_counter() - start
+
+    summary = SimulationSummary.empty()
+    for shard, _ in results:
+        summary = summary.merge(shard)
+    rates = [shard.hands / elapsed if elapsed else 0.0 for shard, elapsed in results]
+    return RunReport(summary, workers, wall_time, rates)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a multi-core Blackjack simulation")
+    parser.add_argument('--hands', type=int, default=1_000_000)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--vectorized', action='store_true', help="use the NumPy simulator in each worker")
+    parser.add_argument('--history', default=None,
+                        help="append every round to this hand history log (scalar engine only)")
+    parser.add_argument('--compare-counts', action='store_true',
+                        help="score every counting system on the same shoes (single process)")
+    parser.add_argument('--play-samples', type=int, default=200,
+                        help="stiff hands sampled per state for playing efficiency")
+    args = parser.parse_args()
+
+    if args.compare_counts:
+        comparison = compare_counts(args.hands, args.seed, max_play_samples=args.play_samples)
+        print(f"Hands: {comparison.hands}  play samples: "
+              + ", ".join(f"{t} v {u}: {n}" for (t, u), n in comparison.play_samples.items()))
+        print(f"{'System':<10} {'Betting':>8} {'Insurance':>10} {'Playing':>8}")
+        for name in comparison.betting_correlation:
+            print(f"{name:<10} {comparison.betting_correlation[name]:>8.3f} "
+                  f"{comparison.insurance_correlation[name]:>10.3f} "
+                  f"{comparison.playing_efficiency[name]:>8.3f}")
+        return
+
+    report = run(args.hands, args.workers, args.seed, vectorized=args.vectorized,
+                 history=args.history)
+    summary = report.summary
+    print(f"Hands: {summary.hands}  EV: {summary.ev:+.5f}  SD: {summary.std:.4f}")
+    print(f"Workers: {report.workers}  Wall: {report.wall_time:.2f}s  "
+          f"Throughput: {report.hands_per_sec:,.0f} hands/s")
+    for i, rate in enumerate(report.worker_rates):
+        print(f"  worker {i}: {rate:,.0f} hands/s")
+    for tc, ev in summary.bucket_ev().items():
+        print(f"  TC {tc:+d}: EV {ev:+.4f}")
+
+
+if __name__ == "__main__":
+    main()
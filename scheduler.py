@@ -0,0 +1,88 @@
+from collections import deque
+
+
+class Scheduler:
+    """One timed event queue for the current round.
+
+    Replaces ad-hoc `master.after` chains: every delay goes through
+    `schedule`, is scaled by a global speed factor, and can be cancelled in
+    one call when the round is reset. In turbo mode delays are ignored and
+    events run back to back inside a single Tk callback, so idle-time
+    rendering only ever shows the state where the chain stops.
+    """
+
+    def __init__(self, master, speed=1.0, turbo=False):
+        self.master = master
+        self.speed = speed
+        self.turbo = turbo
+        self._timers = {}        # token -> Tk after id
+        self._queue = deque()    # turbo events waiting to run
+        self._draining = False
+        self._drain_id = None
+        self._next_token = 0
+        self._generation = 0     # bumped by cancel_all; stale events are dropped
+
+    def schedule(self, delay_ms, callback, *args):
+        """Run callback(*args) after delay_ms (scaled by speed, zero in turbo mode)"""
+        if self.turbo:
+            self._queue.append((self._generation, callback, args))
+            if not self._draining and self._drain_id is None:
+                self._drain_id = self.master.after(0, self._drain)
+            return None
+
+        token = self._next_token
+        self._next_token += 1
+        delay = max(0, int(delay_ms / self.speed)) if self.speed > 0 else 0
+        self._timers[token] = self.master.after(delay, self._fire, token, callback, args)
+        return token
+
+    def cancel(self, token):
+        after_id = self._timers.pop(token, None)
+        if after_id is not None:
+            self.master.after_cancel(after_id)
+
+    def cancel_all(self):
+        """Drop every pending event of the current round"""
+        for after_id in self._timers.values():
+            self.master.after_cancel(after_id)
+        self._timers.clear()
+        self._queue.clear()
+        if self._drain_id is not None:
+            self.master.after_cancel(self._drain_id)
+            self._drain_id = None
+        self._generation += 1
+
+    @property
+    def pending(self):
+        return len(self._timers) + len(self._queue)
+
+    def set_speed(self, speed):
+        """Change the speed factor for events scheduled from now on"""
+        self.speed = speed
+
+    def set_turbo(self, turbo):
+        self.turbo = turbo
+
+    def flush(self):
+        """Turbo only: run every queued event now instead of on the next Tk callback"""
+        if self._drain_id is not None:
+            self.master.after_cancel(self._drain_id)
+            self._drain_id = None
+        if not self._draining:
+            self._drain()
+
+    def _fire(self, token, callback, args):
+        if self._timers.pop(token, None) is not None:
+            callback(*args)
+
+    def _drain(self):
+        """Run queued turbo events, including ones they schedule, until the queue is empty"""
+        self._drain_id = None
+        self._draining = True
+        try:
+            while self._queue:
+                generation, callback, args = self._queue.popleft()
+                if generation == self._generation:
+                    callback(*args)
+        finally:
+            self._draining = False
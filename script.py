@@ -1,10 +1,27 @@
 from PIL import Image, ImageDraw
+import argparse
+import hashlib
+import json
 import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from deck import (ALL_IMAGE_CARDS, ATLAS_INDEX_PATH, ATLAS_PATH, ATLAS_SIZES, BUILD_DIR, CARD_DIR,
+                  IMAGE_VARIANTS, card_name)
 
-CARD_DIR = "assets/card_images"
 PADDING = 8         # khoảng trắng xung quanh
 RADIUS = 15         # bo góc
 BG_COLOR = (45, 90, 61, 255)   # nền trắng
+MANIFEST = "manifest.json"
+PIPELINE_VERSION = 2  # tăng khi đổi cách xử lý ảnh để build lại toàn bộ
+
+def pipeline_settings(style):
+    """Mọi thứ ảnh hưởng tới ảnh đầu ra; đổi một giá trị là manifest cũ hết hiệu lực."""
+    settings = {"version": PIPELINE_VERSION, "style": style,
+                "variants": {k: list(v) for k, v in IMAGE_VARIANTS.items()}}
+    if style:
+        settings.update(padding=PADDING, radius=RADIUS, bg=list(BG_COLOR))
+    return settings
 
 def add_rounded_corners(im, radius):
     """Tạo mask bo góc cho ảnh."""
@@ -14,21 +31,141 @@ def add_rounded_corners(im, radius):
     im.putalpha(mask)
     return im
 
-for filename in os.listdir(CARD_DIR):
-    if filename.endswith(".png"):
-        path = os.path.join(CARD_DIR, filename)
-        img = Image.open(path).convert("RGBA")
+def style_card(path):
+    """Bo góc + padding + nền cho một ảnh gốc (không sửa file gốc)."""
+    img = add_rounded_corners(Image.open(path).convert("RGBA"), RADIUS)
+    canvas = Image.new("RGBA", (img.width + PADDING * 2, img.height + PADDING * 2), BG_COLOR)
+    canvas.paste(img, (PADDING, PADDING), img)
+    return canvas
+
+def find_sources(source_dir):
+    """{tên lá: [ảnh gốc, ảnh @2x hoặc None]} cho mọi PNG trong thư mục nguồn."""
+    sources = {}
+    for filename in sorted(os.listdir(source_dir)):
+        if not filename.endswith(".png"):
+            continue
+        stem = filename[:-len(".png")]
+        hi_res = stem.endswith("@2x")
+        name = stem[:-len("@2x")] if hi_res else stem
+        sources.setdefault(name, [None, None])[hi_res] = os.path.join(source_dir, filename)
+    return {name: paths for name, paths in sources.items() if paths[0]}
+
+def source_hash(paths):
+    digest = hashlib.sha256()
+    for path in paths:
+        if path:
+            with open(path, "rb") as f:
+                digest.update(f.read())
+    return digest.hexdigest()
+
+def output_paths(name, output_dir):
+    return [os.path.join(output_dir, f"{name}{suffix}.png") for suffix in IMAGE_VARIANTS]
+
+def load_source(path, style):
+    """Ảnh nguồn, bo góc + padding nếu là ảnh thô (ảnh trong CARD_DIR đã có sẵn)."""
+    return style_card(path) if style else Image.open(path).convert("RGBA")
+
+def render_card(name, source, hi_res, output_dir, style=False):
+    """Xuất mọi kích thước của một lá (chạy trong process con); trả về tên lá."""
+    styled = load_source(source, style)
+    styled_hi = load_source(hi_res, style) if hi_res else styled
+    for (suffix, size), path in zip(IMAGE_VARIANTS.items(), output_paths(name, output_dir)):
+        # Kích thước lớn hơn bản 1x lấy từ ảnh @2x nếu có
+        base = styled_hi if size[0] > ATLAS_SIZES[0][0] else styled
+        tmp_path = path + ".tmp"
+        base.resize(size, Image.LANCZOS).save(tmp_path, "PNG")
+        os.replace(tmp_path, path)  # không bao giờ để lại file ghi dở
+    return name
+
+def load_manifest(output_dir, settings):
+    try:
+        with open(os.path.join(output_dir, MANIFEST)) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return manifest.get("files", {}) if manifest.get("settings") == settings else {}
+
+def save_manifest(output_dir, settings, files):
+    path = os.path.join(output_dir, MANIFEST)
+    with open(path + ".tmp", "w") as f:
+        json.dump({"settings": settings, "files": files}, f, indent=1, sort_keys=True)
+    os.replace(path + ".tmp", path)
+
+def build_assets(source_dir=CARD_DIR, output_dir=BUILD_DIR, workers=None, force=False, style=False):
+    """Build mọi kích thước cho các ảnh gốc đã đổi (so với manifest); trả về số lá đã build.
+
+    Ảnh gốc chỉ được đọc. Ảnh trong CARD_DIR đã được bo góc + padding sẵn nên
+    mặc định chỉ resize; style=True dành cho ảnh thô (vd. một theme mới).
+    Chạy lại khi không có gì đổi thì không decode ảnh nào.
+    """
+    start = time.perf_counter()
+    os.makedirs(output_dir, exist_ok=True)
+    settings = pipeline_settings(style)
+    manifest = {} if force else load_manifest(output_dir, settings)
+    sources = find_sources(source_dir)
+    hashes = {name: source_hash(paths) for name, paths in sources.items()}
+    stale = [name for name in sources
+             if manifest.get(name) != hashes[name]
+             or not all(os.path.exists(p) for p in output_paths(name, output_dir))]
+
+    files = {name: manifest[name] for name in sources if name in manifest and name not in stale}
+    if stale:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            jobs = [pool.submit(render_card, name, *sources[name], output_dir, style)
+                    for name in stale]
+            for job in jobs:
+                name = job.result()
+                files[name] = hashes[name]
+                print(f"Đã xử lý {name}")
+    save_manifest(output_dir, settings, files)
+    print(f"✅ {len(stale)} / {len(sources)} lá cần build, {len(IMAGE_VARIANTS)} kích thước, "
+          f"{time.perf_counter() - start:.2f}s")
+    return len(stale)
+
+def build_atlas(output_dir=BUILD_DIR):
+    """Đóng gói mọi lá (đã resize sẵn theo từng kích thước UI dùng) vào một file RGBA thô + index JSON.
 
-        # Bo góc ảnh gốc
-        img = add_rounded_corners(img, RADIUS)
+    Luôn ghi ATLAS_PATH/ATLAS_INDEX_PATH, là atlas game dùng; output_dir khác BUILD_DIR sẽ thay ảnh của game.
+    """
+    start = time.perf_counter()
+    sprites = {}
+    offset = 0
+    with open(ATLAS_PATH, "wb") as out:
+        for card in ALL_IMAGE_CARDS:
+            name = card_name(card)
+            entries = sprites.setdefault(name, {})
+            for suffix, size in IMAGE_VARIANTS.items():
+                source = os.path.join(output_dir, f"{name}{suffix}.png")
+                if not os.path.exists(source):
+                    continue
+                data = Image.open(source).convert("RGBA").tobytes()
+                out.write(data)
+                entries[f"{size[0]}x{size[1]}"] = [offset, size[0], size[1]]
+                offset += len(data)
 
-        # Tạo canvas với padding và nền trắng
-        new_size = (img.width + PADDING * 2, img.height + PADDING * 2)
-        canvas = Image.new("RGBA", new_size, BG_COLOR)
-        canvas.paste(img, (PADDING, PADDING), img)
+    with open(ATLAS_INDEX_PATH, "w") as f:
+        json.dump({"format": "RGBA", "sprites": sprites}, f)
+    print(f"✅ Atlas: {len(sprites)} lá x {len(IMAGE_VARIANTS)} kích thước, "
+          f"{offset / 1024 / 1024:.1f} MB, {time.perf_counter() - start:.2f}s")
 
-        # Lưu lại
-        canvas.save(path, "PNG")
-        print(f"Đã xử lý {filename}")
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build ảnh lá bài (1x, @2x, thumbnail) từ ảnh gốc")
+    parser.add_argument("--source", default=CARD_DIR, help="thư mục ảnh gốc (chỉ đọc), vd. một theme mới")
+    parser.add_argument("--output", default=BUILD_DIR, help="thư mục ảnh đã build")
+    parser.add_argument("--workers", type=int, default=None, help="số process (mặc định: số CPU)")
+    parser.add_argument("--force", action="store_true", help="build lại mọi ảnh, bỏ qua manifest")
+    parser.add_argument("--style", action="store_true",
+                        help="bo góc + padding + nền cho ảnh thô (ảnh trong assets/card_images đã có sẵn)")
+    parser.add_argument("--atlas", action="store_true",
+                        help="đóng gói thêm atlas từ ảnh đã build")
+    args = parser.parse_args()
+    # Atlas luôn ghi vào ATLAS_PATH mà game đọc, nên chỉ được đóng gói từ BUILD_DIR
+    packs_game_assets = os.path.abspath(args.output) == os.path.abspath(BUILD_DIR)
+    if args.atlas and not packs_game_assets:
+        parser.error(f"--atlas chỉ dùng với --output {BUILD_DIR} (atlas của game)")
 
-print("✅ Hoàn tất bo góc + padding + nền trắng!")
+    built = build_assets(args.source, args.output, args.workers, args.force, args.style)
+    # deck.py ưu tiên atlas, nên atlas cũ đóng gói từ BUILD_DIR cũng phải cập nhật theo
+    stale_atlas = os.path.exists(ATLAS_INDEX_PATH) and packs_game_assets
+    if (args.atlas or stale_atlas) and (built or not os.path.exists(ATLAS_INDEX_PATH)):
+        build_atlas(args.output)
@@ -0,0 +1,111 @@
+# shuffle.py
+"""Reproducible shoe shuffling shared by the GUI, the engine and vecsim.
+
+Every shuffle is a Fisher-Yates pass over the unshuffled shoe driven by a
+SplitMix64 stream. SplitMix64 is counter based (output k only depends on the
+seed and k), so the scalar ShuffleStream and the NumPy batch shuffler in
+`shuffle_batch` produce identical shoe orders for the same seed and stream
+index: engine shoe N with seed S is VectorShoes(seed=S) row 0, shoe N.
+
+    stream = ShuffleStream(seed=42)
+    stream.shuffle(cards)   # in place, no allocation
+"""
+import os
+
+MASK64 = (1 << 64) - 1
+GAMMA = 0x9E3779B97F4A7C15
+
+DEFAULT_PENETRATION = 0.75  # cut card after 3/4 of the shoe (one deck left of four)
+
+
+def _mix(z):
+    z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & MASK64
+    z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & MASK64
+    return z ^ (z >> 31)
+
+
+def stream_seed(seed, index=0):
+    """Seed of stream `index` (e.g. one per vectorized shoe) under a master seed"""
+    return _mix((seed + GAMMA * (index + 1)) & MASK64)
+
+
+def random_seed():
+    return int.from_bytes(os.urandom(8), 'little')
+
+
+class ShuffleStream:
+    """Seedable SplitMix64 stream with in-place Fisher-Yates shuffling"""
+
+    def __init__(self, seed=None, index=0):
+        self.seed = random_seed() if seed is None else seed
+        self.state = stream_seed(self.seed, index)
+        self._spare = None  # low half of the last output, used by the next below()
+
+    def next64(self):
+        self.state = (self.state + GAMMA) & MASK64
+        return _mix(self.state)
+
+    def below(self, n):
+        """Uniform integer in [0, n) by multiply-shift (n < 2**32); two draws per 64-bit output"""
+        if self._spare is None:
+            x = self.next64()
+            self._spare = x & 0xFFFFFFFF
+            return ((x >> 32) * n) >> 32
+        x, self._spare = self._spare, None
+        return (x * n) >> 32
+
+    def shuffle(self, cards, start=0, stop=None):
+        """Fisher-Yates shuffle of cards[start:stop] in place; always starts on a fresh output"""
+        stop = len(cards) if stop is None else stop
+        self._spare = None
+        for i in range(stop - 1, start, -1):
+            j = start + self.below(i - start + 1)
+            cards[i], cards[j] = cards[j], cards[i]
+
+    def insert(self, cards, start, stop):
+        """Mix cards[start:stop] into the already shuffled cards[:start] at random positions.
+
+        Inside-out Fisher-Yates: if cards[:start] is uniformly shuffled, so is
+        cards[:stop] afterwards. Used by the continuous shuffler.
+        """
+        for i in range(start, stop):
+            j = self.below(i + 1)
+            cards[i], cards[j] = cards[j], cards[i]
+
+
+def shuffle_batch(base, seeds, counters):
+    """Shuffle `base` once per row with NumPy; row r uses stream seeds[r] from draw counters[r].
+
+    Returns a (rows, len(base)) array holding the same orders ShuffleStream
+    would give, and advances `counters` in place by the draws used.
+    """
+    import numpy as np
+
+    rows = len(seeds)
+    size = len(base)
+    outputs = size // 2  # 64-bit outputs for size - 1 draws of 32 bits
+    steps = np.arange(1, outputs + 1, dtype=np.uint64)
+    with np.errstate(over='ignore'):
+        z = seeds[None, :] + np.uint64(GAMMA) * (counters[None, :] + steps[:, None])
+        z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+        z ^= z >> np.uint64(31)
+    halves = np.empty((2 * outputs, rows), dtype=np.uint64)
+    halves[0::2] = z >> np.uint64(32)
+    halves[1::2] = z & np.uint64(0xFFFFFFFF)
+    # Draw k (k = 0..size-2) picks j in [0, size - k) for position size - 1 - k
+    bounds = np.arange(size, 1, -1, dtype=np.uint64)
+    picks = ((halves[:size - 1] * bounds[:, None]) >> np.uint64(32)).astype(np.intp)
+    counters += np.uint64(outputs)
+
+    # Shuffle in a (size, rows) layout: position i of every row is one contiguous slice
+    cols = np.array(np.broadcast_to(np.asarray(base)[:, None], (size, rows)))
+    flat = cols.reshape(-1)
+    ar = np.arange(rows)
+    for k in range(size - 1):
+        i = size - 1 - k
+        where = picks[k] * rows + ar
+        swap = flat[where]
+        flat[where] = cols[i]
+        cols[i] = swap
+    return cols.T
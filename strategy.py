@@ -0,0 +1,57 @@
+# strategy.py
+"""Playing strategies for the headless engine.
+
+A strategy is a callable `strategy(engine) -> action` returning one of the
+engine actions (HIT, STAND, DOUBLE, INSURANCE).
+"""
+from engine import HIT, STAND, DOUBLE, DEALER_STANDS_ON
+from deck import CARD_VALUE
+
+# Basic strategy for 4 decks, dealer stands on soft 17, no split/surrender.
+# Rows: player total; columns: dealer upcard 2..11 (ace = 11).
+# 'H' hit, 'S' stand, 'D' double else hit, 'Ds' double else stand.
+_HARD = {
+    9:  ['H', 'D', 'D', 'D', 'D', 'H', 'H', 'H', 'H', 'H'],
+    10: ['D', 'D', 'D', 'D', 'D', 'D', 'D', 'D', 'H', 'H'],
+    11: ['D', 'D', 'D', 'D', 'D', 'D', 'D', 'D', 'D', 'H'],
+    12: ['H', 'H', 'S', 'S', 'S', 'H', 'H', 'H', 'H', 'H'],
+    13: ['S', 'S', 'S', 'S', 'S', 'H', 'H', 'H', 'H', 'H'],
+    14: ['S', 'S', 'S', 'S', 'S', 'H', 'H', 'H', 'H', 'H'],
+    15: ['S', 'S', 'S', 'S', 'S', 'H', 'H', 'H', 'H', 'H'],
+    16: ['S', 'S', 'S', 'S', 'S', 'H', 'H', 'H', 'H', 'H'],
+}
+_SOFT = {
+    13: ['H', 'H', 'H', 'D', 'D', 'H', 'H', 'H', 'H', 'H'],
+    14: ['H', 'H', 'H', 'D', 'D', 'H', 'H', 'H', 'H', 'H'],
+    15: ['H', 'H', 'D', 'D', 'D', 'H', 'H', 'H', 'H', 'H'],
+    16: ['H', 'H', 'D', 'D', 'D', 'H', 'H', 'H', 'H', 'H'],
+    17: ['H', 'D', 'D', 'D', 'D', 'H', 'H', 'H', 'H', 'H'],
+    18: ['S', 'Ds', 'Ds', 'Ds', 'Ds', 'S', 'S', 'H', 'H', 'H'],
+}
+
+
+def basic_action(score, soft, upcard_value, can_double):
+    """Look up the basic strategy action for a total against a dealer upcard"""
+    table = _SOFT if soft else _HARD
+    if score not in table:
+        if soft:
+            return STAND if score >= 19 else HIT
+        return STAND if score >= 17 else HIT
+    code = table[score][upcard_value - 2]
+    if code == 'D':
+        return DOUBLE if can_double else HIT
+    if code == 'Ds':
+        return DOUBLE if can_double else STAND
+    return HIT if code == 'H' else STAND
+
+
+def basic_strategy(engine):
+    """Basic strategy for the game's rules; never takes insurance"""
+    hand = engine.player_hand
+    upcard_value = CARD_VALUE[engine.dealer_hand[0]]
+    return basic_action(hand.score, hand.is_soft, upcard_value, engine.double_allowed())
+
+
+def mimic_dealer(engine):
+    """Hit below 17 like the dealer does"""
+    return HIT if engine.player_hand.score < DEALER_STANDS_ON else STAND
@@ -1,12 +1,35 @@
+import time
 import tkinter as tk
-import random
-from deck import create_deck, draw_from_top, card_image, card_thumbnail, get_deck_info
-from game_logic import calculate_score, is_blackjack
-from utils import clear_frame
+from collections import deque
+from deck import card_image, card_thumbnail, card_name, image_cache, preload_card_images
+from dealer import bust_probability, value_index
+from ev import EVService
+from analytics import LiveStats
+from betting import RuleConfig, flat_bet, load_edges
+from counting import SYSTEMS
+from history import HistoryWriter
+from instrument import Profiler, instrument_app
+from scheduler import Scheduler
+from shuffle import DEFAULT_PENETRATION, ShuffleStream
+from strategy import basic_strategy
+from engine import (BlackjackEngine, BLACKJACK, BLACKJACK_PUSH, BUST, DEALER_BUST,
+                    WIN, LOSE, PUSH, HIT, STAND, DOUBLE)
+from render import CardRow
+from canvas_render import CanvasTable, FRAME_SAMPLES
 
 # Constants
-RESHUFFLE_THRESHOLD = 52  # Reshuffle when less than 1 deck remains
 DISCARD_SHOW_MAX = 1  # Only show last card
+EV_POLL_MS = 50  # How often to check for a finished EV calculation
+RENDERERS = ('labels', 'canvas')  # Frame/Label layout or single-Canvas table
+CANVAS_SIZE = (880, 460)
+
+# Autoplay: bet units by true count (lowest threshold first) and pacing
+AUTOPLAY_BET_RAMP = [(1, 2), (2, 4), (3, 6), (4, 8)]  # (true count >=, units)
+AUTOPLAY_UNIT = 5
+AUTOPLAY_TICK_MS = 33    # one throttled redraw per tick (~30 fps)
+AUTOPLAY_SLICE_MS = 20   # time spent playing hands per tick; the rest is left to Tk
+PROFILE_OVERLAY_MS = 500  # profiling overlay refresh (toggle with F2)
+PROFILE_OVERLAY_ROWS = 12
 COLORS = {
     'bg_main': '#0f5132',
     'bg_table': '#2d5a3d', 
@@ -16,13 +39,33 @@ COLORS = {
     'text_highlight': 'gold',
     'text_warning': 'yellow'
 }
+RESULT_MESSAGES = {
+    BLACKJACK: "🎉 Blackjack! You win!",
+    BLACKJACK_PUSH: "Push! Both have Blackjack!",
+    BUST: "💥 Bust! You lose!",
+    DEALER_BUST: "🎉 Dealer busts! You win!",
+    WIN: "🎉 You win!",
+    LOSE: "😞 You lose!",
+    PUSH: "🤝 Push! It's a tie!"
+}
 
 class BlackjackApp:
-    def __init__(self, master):
+    def __init__(self, master, preload_images=True, renderer='labels', speed=1.0, turbo=False,
+                 seed=None, penetration=DEFAULT_PENETRATION, csm=False, history_path=None):
+        if renderer not in RENDERERS:
+            raise ValueError(f"renderer must be one of {RENDERERS}")
         self.master = master
+        self.renderer = renderer
+        self._shoe_options = {'rng': ShuffleStream(seed), 'penetration': penetration, 'csm': csm}
+        self.history = HistoryWriter(history_path) if history_path else None
+        # All round timers go through one scheduler so a reset can cancel them
+        self.scheduler = Scheduler(master, speed=speed, turbo=turbo)
         self._setup_window()
         self._init_game_state()
         self._setup_ui()
+        if preload_images:
+            # Decoded on worker threads; cards dealt before it finishes show as text until then
+            preload_card_images(master, on_done=self._on_images_ready)
         self.reset_game()
         self.result_label.config(text="💳 Balance reset! Good luck!")
 
@@ -31,36 +74,42 @@ class BlackjackApp:
         self.master.title("Enhanced Blackjack - 4 Deck Shoe")
         self.master.geometry("950x700")  # Slightly larger for deck info
         self.master.configure(bg=COLORS['bg_main'])
+        self.master.protocol("WM_DELETE_WINDOW", self._on_close)
+        self.master.bind("<F2>", self.toggle_profile_overlay)
 
     def _init_game_state(self):
         """Initialize all game state variables"""
-        # Financial state
-        self.balance = 1000
-        self.bet = 0
-        self.insurance_bet = 0
-        
-        # Game state
-        self.can_double_down = False
-        self.can_split = False
-        self.game_in_progress = False
-        
-        # Cards
-        deck_info = get_deck_info()
-        self.total_cards = deck_info['total_cards']
-        self.num_decks = deck_info['num_decks']
-        
-        self.deck = create_deck()
-        random.shuffle(self.deck)
-        self.discard_pile = []
-        self.player_hand = []
-        self.dealer_hand = []
-        self.player_imgs = []
-        self.dealer_imgs = []
-        self.discard_imgs = []
-        
-        # Card counting
-        self.running_count = 0
-        self.cards_seen = 0
+        # Rules, shoe, bankroll and counting live in the headless engine
+        self.engine = BlackjackEngine(on_reshuffle=self._on_reshuffle, history=self.history,
+                                      **self._shoe_options)
+
+        self.stats = LiveStats()
+        # Hot-path timers, patched in only while profiling (see instrument.py)
+        self.profiler = Profiler()
+        self.profile_overlay = None
+        self._profile_overlay_after = None
+        self._profiling_pinned = False  # enabled from the command line: F2 only hides the overlay
+        # Kelly edge table for these rules; None until `python betting.py` has cached one
+        self.edges = load_edges(RuleConfig.from_engine(self.engine))
+
+        # Autoplay bot (see start_autoplay)
+        self.autoplay = False
+        self.autoplay_ramp = AUTOPLAY_BET_RAMP
+        self.autoplay_unit = AUTOPLAY_UNIT
+        self.autoplay_render_every = None  # redraw every N hands instead of once per tick
+        self.autoplay_hands = 0
+        self._autoplay_after = None
+        self._autoplay_prev_turbo = False
+
+        # Hit/Stand/Double EVs are computed in a worker process, started on first use
+        self.ev_service = None
+        self._ev_poll_after = None  # the single pending _poll_ev, if any
+
+        # Render state: update_ui/update_discard_ui only mark what changed
+        self._render_pending = False
+        self._reveal_dealer = False
+        self._discard_dirty = True
+        self.frame_times = deque(maxlen=FRAME_SAMPLES)  # seconds per _render pass
 
     def _setup_ui(self):
         """Setup all UI components"""
@@ -68,6 +117,7 @@ class BlackjackApp:
         self._create_game_table()
         self._create_action_buttons()
         self._create_betting_section()
+        self._create_card_rows()
 
     def _create_header(self):
         """Create title and deck info display"""
@@ -76,7 +126,7 @@ class BlackjackApp:
                 bg=COLORS['bg_main']).pack(pady=10)
 
         # Deck info
-        self.deck_info_label = tk.Label(self.master, text=f"📚 Cards Remaining: {len(self.deck)} / {self.total_cards}",
+        self.deck_info_label = tk.Label(self.master, text=self._deck_info_text(),
                                        font=('Arial', 12), fg=COLORS['text_secondary'], 
                                        bg=COLORS['bg_main'])
         self.deck_info_label.pack(pady=2)
@@ -86,8 +136,18 @@ class BlackjackApp:
                                  bg=COLORS['bg_main'])
         self.bet_label.pack(pady=2)
 
+        # Live session stats (analytics.LiveStats)
+        self.stats_label = tk.Label(self.master, text=self._stats_text(),
+                                    font=('Arial', 10), fg=COLORS['text_secondary'],
+                                    bg=COLORS['bg_main'])
+        self.stats_label.pack(pady=1)
+
     def _create_game_table(self):
         """Create the main game table with dealer and player areas"""
+        if self.renderer == 'canvas':
+            self._create_canvas_table()
+            return
+
         game_table = tk.Frame(self.master, bg=COLORS['bg_table'], relief='raised', bd=10)
         game_table.pack(pady=20, padx=30, fill='both', expand=True)
 
@@ -102,6 +162,42 @@ class BlackjackApp:
         # Player section
         self._create_player_section(game_table)
 
+    def _create_canvas_table(self):
+        """Draw the whole game table on one Canvas; texts expose the Label interface"""
+        width, height = CANVAS_SIZE
+        frame = tk.Frame(self.master, bg=COLORS['bg_table'], relief='raised', bd=10)
+        frame.pack(pady=20, padx=30, fill='both', expand=True)
+        self.table = CanvasTable(frame, COLORS['bg_table'], width, height,
+                                 shoe_position=(width - 120, -130))
+        text = self.table.text
+
+        # Dealer area with discard pile on the right
+        text(width // 2, 18, "🎩 DEALER", COLORS['text_primary'], ('Arial', 16, 'bold'))
+        self.dealer_score_label = text(width // 2, 42, "Score: ?", COLORS['text_secondary'], ('Arial', 12))
+        self.discard_title = text(790, 60, "🗂️ Last Card", COLORS['text_primary'], ('Arial', 12, 'bold'))
+        self.discard_count_label = text(790, 82, "(0 cards used)", COLORS['text_secondary'], ('Arial', 10))
+
+        # Result display
+        self.result_label = text(width // 2, 205, "", COLORS['text_warning'], ('Arial', 18, 'bold'))
+
+        # Player info
+        text(150, 240, "👤 PLAYER", COLORS['text_primary'], ('Arial', 16, 'bold'))
+        self.balance_label = text(150, 265, f"💰 Balance: ${self.engine.balance}",
+                                  COLORS['text_highlight'], ('Arial', 14, 'bold'))
+        self.player_score_label = text(150, 290, "Score: 0", COLORS['text_secondary'], ('Arial', 12))
+
+        # Card counting panel
+        x = 780
+        self.table.canvas.create_window(x, 212, window=self._create_count_selector(self.table.canvas))
+        text(x, 235, "🧮 CARD COUNTING", COLORS['text_highlight'], ('Arial', 12, 'bold'))
+        self.running_count_label = text(x, 257, "Running Count: 0", '#00ff00', ('Arial', 11, 'bold'))
+        self.true_count_label = text(x, 277, "True Count: 0.0", '#ffff00', ('Arial', 11, 'bold'))
+        self.decks_remaining_label = text(x, 295, "Decks Left: 4.0", COLORS['text_secondary'], ('Arial', 10))
+        self.dealer_odds_label = text(x, 313, "Dealer Bust: --", COLORS['text_secondary'], ('Arial', 10))
+        self.ev_label = text(x, 338, "EV: --", 'white', ('Arial', 9, 'bold'))
+        self.strategy_hint_label = text(x, 365, "Advantage: Neutral", 'white', ('Arial', 10, 'bold'))
+        self.betting_suggestion_label = text(x, 383, "💰 Standard Bet", 'white', ('Arial', 9, 'bold'))
+
     def _create_dealer_section(self, parent):
         """Create dealer area with cards and discard pile"""
         dealer_section = tk.Frame(parent, bg=COLORS['bg_table'])
@@ -157,7 +253,7 @@ class BlackjackApp:
         tk.Label(player_info, text="👤 PLAYER", font=('Arial', 16, 'bold'), 
                 fg=COLORS['text_primary'], bg=COLORS['bg_table']).pack()
 
-        self.balance_label = tk.Label(player_info, text=f"💰 Balance: ${self.balance}",
+        self.balance_label = tk.Label(player_info, text=f"💰 Balance: ${self.engine.balance}",
                                      font=('Arial', 14, 'bold'), fg=COLORS['text_highlight'], 
                                      bg=COLORS['bg_table'])
         self.balance_label.pack()
@@ -180,6 +276,9 @@ class BlackjackApp:
         tk.Label(counting_panel, text="🧮 CARD COUNTING", font=('Arial', 12, 'bold'), 
                 fg=COLORS['text_highlight'], bg=COLORS['bg_table']).pack()
 
+        # Counting system shown in the panel
+        self._create_count_selector(counting_panel).pack()
+
         # Running count
         self.running_count_label = tk.Label(counting_panel, text="Running Count: 0", 
                                            font=('Arial', 11, 'bold'), fg='#00ff00', 
@@ -198,6 +297,18 @@ class BlackjackApp:
                                              bg=COLORS['bg_table'])
         self.decks_remaining_label.pack()
 
+        # Exact dealer bust chance for the upcard and the unseen cards
+        self.dealer_odds_label = tk.Label(counting_panel, text="Dealer Bust: --", 
+                                         font=('Arial', 10), fg=COLORS['text_secondary'], 
+                                         bg=COLORS['bg_table'])
+        self.dealer_odds_label.pack()
+
+        # Exact EV of each action for the current hand
+        self.ev_label = tk.Label(counting_panel, text="EV: --", 
+                                font=('Arial', 9, 'bold'), fg='white', 
+                                bg=COLORS['bg_table'])
+        self.ev_label.pack()
+
         # Basic strategy hint
         self.strategy_hint_label = tk.Label(counting_panel, text="Advantage: Neutral", 
                                            font=('Arial', 10, 'bold'), fg='white', 
@@ -210,6 +321,15 @@ class BlackjackApp:
                                                 bg=COLORS['bg_table'])
         self.betting_suggestion_label.pack()
 
+    def _create_count_selector(self, parent):
+        """Drop-down of counting systems; every system is tracked, this only picks the one shown"""
+        self.count_system_var = tk.StringVar(value=self.engine.count_system)
+        selector = tk.OptionMenu(parent, self.count_system_var, *SYSTEMS,
+                                 command=self.set_count_system)
+        selector.config(font=('Arial', 9), bg=COLORS['bg_table'], fg=COLORS['text_primary'],
+                        highlightthickness=0)
+        return selector
+
     def _create_action_buttons(self):
         """Create game action buttons with betting tokens"""
         action_frame = tk.Frame(self.master, bg=COLORS['bg_main'])
@@ -270,6 +390,13 @@ class BlackjackApp:
             btn.grid(row=0, column=4+i, padx=8)
             self.token_buttons[amount] = btn
 
+        # Kelly suggestion for the current count (needs a cached edge table)
+        self.suggest_btn = tk.Button(middle_row, text="💡 --", command=self.suggested_bet,
+                                     font=('Arial', 11, 'bold'), bg='#fd7e14',
+                                     fg=COLORS['text_primary'], width=6, height=2,
+                                     relief='solid', bd=3, cursor='hand2')
+        self.suggest_btn.grid(row=0, column=4+len(tokens_config), padx=8)
+
         tk.Frame(self.master, bg=COLORS['bg_main'], height=20).pack(fill='x')
 
     def _create_betting_section(self):
@@ -294,40 +421,109 @@ class BlackjackApp:
                      font=('Arial', 12, 'bold'), bg=color, 
                      fg=COLORS['text_primary'], height=2).pack(side=tk.LEFT, padx=15)
 
-    # Game Logic Methods (optimized)
-    def _draw_card(self):
-        """Draw card with automatic reshuffling"""
-        if len(self.deck) <= RESHUFFLE_THRESHOLD:
-            self.deck = create_deck()
-            random.shuffle(self.deck)
-            self.discard_pile.clear()
-            self.running_count = 0
-            self.cards_seen = 0
-            self.update_discard_ui()
-            self.update_counting_display()
-            self.result_label.config(text="🔄 Reshuffled new deck!")
-        
-        card = draw_from_top(self.deck)
-        self._update_card_count(card)
-        return card
-
-    def _update_card_count(self, card):
-        """Update card counting based on Hi-Lo system"""
-        rank = card.split('_')[0]
-        self.cards_seen += 1
-        
-        # Hi-Lo counting system
-        if rank in ['2', '3', '4', '5', '6']:
-            self.running_count += 1
-        elif rank in ['10', 'jack', 'queen', 'king', 'ace']:
-            self.running_count -= 1
-        # 7, 8, 9 are neutral (0)
+        self.autoplay_btn = tk.Button(control_frame, text="🤖 Autoplay", width=15,
+                                      command=self.toggle_autoplay,
+                                      font=('Arial', 12, 'bold'), bg='#6c757d',
+                                      fg=COLORS['text_primary'], height=2)
+        self.autoplay_btn.pack(side=tk.LEFT, padx=15)
+
+    # Game Logic Methods (delegated to the engine)
+    def _on_reshuffle(self):
+        """Refresh displays after the engine reshuffled the shoe"""
+        self.update_discard_ui()
+        self.update_counting_display()
+        self.result_label.config(text="🔄 Reshuffled new deck!")
+
+    def _deck_info_text(self):
+        shoe = self.engine.shoe
+        return f"📚 Cards Remaining: {len(shoe)} / {shoe.total_cards}  ({shoe.penetration():.0%} dealt)"
+
+    def _stats_text(self):
+        stats = self.stats
+        if not stats.hands:
+            return "📊 No hands yet"
+        return (f"📊 Hands {stats.hands}  Win {stats.win_rate:.1%}  EV {stats.ev:+.3f}  "
+                f"SD {stats.std:.2f}  | last {len(stats.recent_results)}: "
+                f"Win {stats.rolling_win_rate:.0%}  EV {stats.rolling_ev:+.3f}  "
+                f"| Bankroll {stats.bankroll:+,.0f}")
 
     def _calculate_true_count(self):
         """Calculate true count (running count / estimated decks remaining)"""
-        cards_remaining = len(self.deck)
-        decks_remaining = max(cards_remaining / 52, 0.5)  # Minimum 0.5 to avoid division issues
-        return self.running_count / decks_remaining
+        return self.engine.true_count()
+
+    def _update_dealer_odds(self):
+        """Show the exact dealer bust chance given the upcard and every unseen card"""
+        dealer_hand = self.engine.dealer_hand
+        try:
+            bust = bust_probability(dealer_hand[0], self._unseen_composition())
+        except ValueError:  # too few cards left to finish every dealer hand
+            self.dealer_odds_label.config(text="Dealer Bust: --")
+            return
+        self.dealer_odds_label.config(text=f"Dealer Bust: {bust:.1%}")
+
+    def _unseen_composition(self):
+        """Composition of the shoe plus the dealer's hole card, which is still unseen"""
+        counts = list(self.engine.shoe.composition())
+        for card in self.engine.dealer_hand.cards[1:]:
+            counts[value_index(card)] += 1
+        return tuple(counts)
+
+    def _on_player_turn(self):
+        """The player must act: autoplay decides, otherwise show the action EVs"""
+        if self.autoplay:
+            self.scheduler.schedule(0, self._autoplay_decide)
+        else:
+            self._request_ev()
+
+    def _request_ev(self):
+        """Ask the EV worker about the current decision; show cached results at once"""
+        if self.ev_service is None:
+            self.ev_service = EVService()
+        result = self.ev_service.request(self.engine.player_hand.cards,
+                                         self.engine.dealer_hand[0], self._unseen_composition())
+        if result is not None:
+            self._show_ev(result)
+        else:
+            self.ev_label.config(text="EV: calculating...", fg=COLORS['text_secondary'])
+            if self._ev_poll_after is None:  # one poll loop serves every request
+                self._ev_poll_after = self.master.after(EV_POLL_MS, self._poll_ev)
+
+    def _poll_ev(self):
+        """Pick up a finished EV calculation without blocking the Tk loop"""
+        self._ev_poll_after = None
+        if self.ev_service is None or not self.ev_service.pending:
+            return
+        result = self.ev_service.poll()
+        if result is not None:
+            self._show_ev(result)
+        elif self.ev_service.pending:
+            self._ev_poll_after = self.master.after(EV_POLL_MS, self._poll_ev)
+
+    def _show_ev(self, result):
+        """Display action EVs, highlighting the best one"""
+        evs = {action: ev for action, ev in result.items()
+               if ev is not None and (action != 'double' or self.engine.double_allowed())}
+        best = max(evs, key=evs.get)
+        text = " | ".join(f"{action.title()} {ev:+.3f}" for action, ev in evs.items())
+        self.ev_label.config(text=f"EV {text}\nBest: {best.title()}", fg='#00ff00')
+
+    def _cancel_ev(self):
+        """Drop any in-flight EV request; the hand is about to change"""
+        if self.ev_service is not None:
+            self.ev_service.cancel()
+        if self._ev_poll_after is not None:
+            self.master.after_cancel(self._ev_poll_after)
+            self._ev_poll_after = None
+        self.ev_label.config(text="EV: --", fg='white')
+
+    def _on_close(self):
+        """Stop the EV worker, close the hand history, drop the card images and close the window"""
+        if self.ev_service is not None:
+            self.ev_service.shutdown()
+        if self.history is not None:
+            self.history.close()
+        image_cache.clear()  # its PhotoImages die with this root
+        self.master.destroy()
 
     def _get_advantage_text(self, true_count):
         """Get advantage text based on true count"""
@@ -346,8 +542,23 @@ class BlackjackApp:
         else:
             return "Advantage: Neutral", 'white'
 
+    def _kelly_bet(self, true_count):
+        """Fractional Kelly bet for the balance and true count (flat under CSM), or None without an edge table"""
+        if self.engine.csm:
+            return flat_bet(self.engine.balance)
+        if self.edges is None:
+            return None
+        return self.edges.bet(self.engine.balance, true_count)
+
     def _get_betting_suggestion(self, true_count):
-        """Get betting suggestion based on true count"""
+        """Kelly bet in dollars when an edge table is cached, else a rough hint by true count"""
+        amount = self._kelly_bet(true_count)
+        if self.engine.csm:
+            return f"💰 Flat ${amount} (CSM: no count edge)", 'white'
+        if amount is not None:
+            edge = self.edges.edge(true_count)
+            color = '#00ff00' if edge > 0 else 'white' if edge > -0.01 else '#ff8800'
+            return f"💰 Bet ${amount} (edge {edge:+.1%})", color
         if true_count >= 3:
             return "💰 MAX BET!", '#00ff00'
         elif true_count >= 2:
@@ -361,23 +572,31 @@ class BlackjackApp:
 
     def update_counting_display(self):
         """Update card counting display"""
-        true_count = self._calculate_true_count()
-        decks_remaining = len(self.deck) / 52
+        counter = self.engine.counter
+        system = counter.systems[self.engine.count_system]
+        true_count = self._calculate_true_count()  # Hi-Lo scale, drives the advice below
+        decks_remaining = self.engine.decks_remaining()
         advantage_text, adv_color = self._get_advantage_text(true_count)
         betting_text, bet_color = self._get_betting_suggestion(true_count)
-        
-        self.running_count_label.config(text=f"Running Count: {self.running_count:+d}")
-        self.true_count_label.config(text=f"True Count: {true_count:+.1f}")
+
+        running_text = f"Running Count: {self.engine.running_count:+d}"
+        if system.ace_side_weight:
+            running_text += f"  (aces {counter.ace_surplus(decks_remaining):+.1f})"
+        self.running_count_label.config(text=running_text)
+        self.true_count_label.config(
+            text=f"True Count: {counter.true_count(system.name, decks_remaining):+.1f}")
         self.decks_remaining_label.config(text=f"Decks Left: {decks_remaining:.1f}")
         self.strategy_hint_label.config(text=advantage_text, fg=adv_color)
         self.betting_suggestion_label.config(text=betting_text, fg=bet_color)
+        amount = self._kelly_bet(true_count)
+        self.suggest_btn.config(text=f"💡 ${amount}" if amount else "💡 --")
 
     def _validate_bet(self, amount):
         """Validate bet amount"""
-        if self.game_in_progress:
+        if self.engine.game_in_progress:
             self.result_label.config(text="⚠️ Finish current game first!")
             return False
-        if amount > self.balance:
+        if amount > self.engine.balance:
             self.result_label.config(text="⚠️ Insufficient funds!")
             return False
         if amount < 1:
@@ -388,22 +607,23 @@ class BlackjackApp:
     def quick_bet(self, amount):
         """Place quick bet with animation feedback"""
         if self._validate_bet(amount):
-            self.bet = amount
+            self.engine.bet = amount
             self.result_label.config(text=f"Bet placed: ${amount}")
             # Disable betting buttons during deal
             self.disable_betting_buttons()
-            self.master.after(500, self.start_new_round)
+            self.scheduler.schedule(500, self.start_new_round)
+
+    def suggested_bet(self):
+        """Quick bet of the Kelly amount for the current true count"""
+        amount = self._kelly_bet(self._calculate_true_count())
+        if amount:
+            self.quick_bet(amount)
 
     def start_new_round(self):
         """Start new game round with card dealing animation"""
-        self.game_in_progress = True
-        self.insurance_bet = 0
-        self.can_double_down = True
-        self.can_split = False
-
         # Clear previous hands
-        self.player_hand = []
-        self.dealer_hand = []
+        self.engine.start_round(self.engine.bet)
+        self.dealer_odds_label.config(text="Dealer Bust: --")
         self.update_ui()  # Clear the display first
 
         # Deal cards with animation
@@ -412,164 +632,134 @@ class BlackjackApp:
     def _deal_initial_cards(self):
         """Deal initial cards with animation sequence"""
         # Schedule card dealing sequence
-        self.master.after(200, self._deal_player_card_1)
-        self.master.after(600, self._deal_dealer_card_1)
-        self.master.after(1000, self._deal_player_card_2)
-        self.master.after(1400, self._deal_dealer_card_2)
-        self.master.after(1800, self._finish_initial_deal)
+        self.scheduler.schedule(200, self._deal_player_card_1)
+        self.scheduler.schedule(600, self._deal_dealer_card_1)
+        self.scheduler.schedule(1000, self._deal_player_card_2)
+        self.scheduler.schedule(1400, self._deal_dealer_card_2)
+        self.scheduler.schedule(1800, self._finish_initial_deal)
 
     def _deal_player_card_1(self):
         """Deal first card to player"""
-        card = self._draw_card()
-        self.player_hand.append(card)
+        self.engine.deal_player()
         self.update_ui()
         self.result_label.config(text="Dealing cards...")
 
     def _deal_dealer_card_1(self):
         """Deal first card to dealer"""
-        card = self._draw_card()
-        self.dealer_hand.append(card)
+        self.engine.deal_dealer()
         self.update_ui()
 
     def _deal_player_card_2(self):
         """Deal second card to player"""
-        card = self._draw_card()
-        self.player_hand.append(card)
+        self.engine.deal_player()
         self.update_ui()
 
     def _deal_dealer_card_2(self):
         """Deal second card to dealer (face down)"""
-        card = self._draw_card()
-        self.dealer_hand.append(card)
+        self.engine.deal_dealer()
         self.update_ui()
 
     def _finish_initial_deal(self):
         """Complete the initial deal and check for game conditions"""
-        # Check for split possibility
-        player_ranks = [c.split('_')[0] for c in self.player_hand]
-        self.can_split = player_ranks[0] == player_ranks[1]
-
-        # Check for blackjacks
-        if is_blackjack(self.player_hand):
-            if is_blackjack(self.dealer_hand):
-                self.master.after(500, lambda: self.end_game("Push! Both have Blackjack!"))
-            else:
-                self.master.after(500, lambda: self._player_blackjack_win())
+        # Check split possibility and blackjacks
+        if self.engine.finish_initial_deal():
+            self.scheduler.schedule(500, self._settle_round)
             return
 
+        if not self.autoplay:
+            self._update_dealer_odds()
+
         # Enable insurance if dealer shows ace
-        if self.dealer_hand[0].split('_')[0] == 'ace':
+        if self.engine.insurance_offered():
             self.insurance_btn.config(state='normal')
 
         self.result_label.config(text="")
         self.enable_game_buttons()
-
-    def _player_blackjack_win(self):
-        """Handle player blackjack win"""
-        self.end_game("🎉 Blackjack! You win!")
-        self.balance += int(self.bet * 1.5)
+        self._on_player_turn()
 
     def hit(self):
         """Player hits with animation"""
         # Disable buttons during animation
         self.disable_game_buttons()
+        self._cancel_ev()
         self.result_label.config(text="Drawing card...")
         
         # Draw card with delay
-        self.master.after(300, self._complete_hit)
+        self.scheduler.schedule(300, self._complete_hit)
 
     def _complete_hit(self):
         """Complete the hit action"""
-        card = self._draw_card()
-        self.player_hand.append(card)
-        self.can_double_down = False
-        self.can_split = False
-        
+        player_score = self.engine.hit()
         self.update_ui()
-        player_score = calculate_score(self.player_hand)
         
         if player_score > 21:
-            self.master.after(500, lambda: self._player_bust())
+            self.scheduler.schedule(500, self._settle_round)
         elif player_score == 21:
-            self.master.after(500, self.stand)
+            self.scheduler.schedule(500, self.stand)
         else:
             self.result_label.config(text="")
             self.enable_game_buttons()
-
-    def _player_bust(self):
-        """Handle player bust"""
-        self.end_game("💥 Bust! You lose!")
-        self.balance -= self.bet
+            self._on_player_turn()
 
     def stand(self):
         """Player stands with dealer animation"""
+        self.engine.stand()
         self.disable_game_buttons()
+        self._cancel_ev()
         self.result_label.config(text="Dealer's turn...")
         
         # Start dealer play sequence
-        self.master.after(800, self._dealer_play_sequence)
+        self.scheduler.schedule(800, self._dealer_play_sequence)
 
     def _dealer_play_sequence(self):
         """Animate dealer playing their hand"""
-        dealer_score = calculate_score(self.dealer_hand)
-        
-        if dealer_score < 17:
+        if self.engine.dealer_should_hit():
             # Dealer needs to hit
             self.result_label.config(text="Dealer hits...")
-            card = self._draw_card()
-            self.dealer_hand.append(card)
+            self.engine.deal_dealer()
             self.update_ui(reveal_dealer=True)
             
             # Continue dealer sequence after delay
-            self.master.after(1000, self._dealer_play_sequence)
+            self.scheduler.schedule(1000, self._dealer_play_sequence)
         else:
             # Dealer stands, compare hands
-            self.master.after(500, self.end_game_comparison)
+            self.scheduler.schedule(500, self.end_game_comparison)
 
     def double_down(self):
         """Player doubles down with animation"""
-        if not self.can_double_down or self.bet > self.balance:
+        if not self.engine.double_allowed():
             self.result_label.config(text="⚠️ Cannot double down!")
             return
         
-        self.bet *= 2
         self.disable_game_buttons()
+        self._cancel_ev()
         self.result_label.config(text="Double Down! Drawing one card...")
         
         # Draw card with animation
-        self.master.after(500, self._complete_double_down)
+        self.scheduler.schedule(500, self._complete_double_down)
 
     def _complete_double_down(self):
         """Complete double down action"""
-        card = self._draw_card()
-        self.player_hand.append(card)
-        self.can_double_down = False
-        self.can_split = False
-        
+        player_score = self.engine.double_down()
         self.update_ui()
-        player_score = calculate_score(self.player_hand)
         
         if player_score > 21:
-            self.master.after(500, lambda: self._player_bust())
+            self.scheduler.schedule(500, self._settle_round)
         else:
-            self.master.after(800, self.stand)
+            self.scheduler.schedule(800, self.stand)
 
     def take_insurance(self):
         """Take insurance bet"""
-        insurance_amount = self.bet // 2
-        if insurance_amount > self.balance - self.bet:
+        if not self.engine.can_afford_insurance():
             self.result_label.config(text="⚠️ Cannot afford insurance!")
             return
         
-        self.insurance_bet = insurance_amount
         self.insurance_btn.config(state='disabled')
         
-        if is_blackjack(self.dealer_hand):
+        if self.engine.take_insurance():
             self.result_label.config(text="🛡️ Insurance pays! Dealer has Blackjack!")
-            self.balance += insurance_amount
         else:
             self.result_label.config(text="❌ Insurance lost.")
-            self.balance -= insurance_amount
         
         self.update_ui()
 
@@ -585,48 +775,38 @@ class BlackjackApp:
         self.update_ui(reveal_dealer=True)
         
         # Wait before showing final result
-        self.master.after(1000, self._show_final_result)
+        self.scheduler.schedule(1000, self._settle_round)
 
-    def _show_final_result(self):
-        """Show the final game result"""
-        player_score = calculate_score(self.player_hand)
-        dealer_score = calculate_score(self.dealer_hand)
-        
-        if dealer_score > 21:
-            self.end_game("🎉 Dealer busts! You win!")
-            self.balance += self.bet
-        elif player_score > dealer_score:
-            self.end_game("🎉 You win!")
-            self.balance += self.bet
-        elif player_score < dealer_score:
-            self.end_game("😞 You lose!")
-            self.balance -= self.bet
-        else:
-            self.end_game("🤝 Push! It's a tie!")
+    def _settle_round(self):
+        """Let the engine pay out the round and show the final result"""
+        outcome = self.engine.settle()
+        self.stats.add_engine_round(self.engine)
+        if self.history is not None and not self.autoplay:
+            self.history.flush()  # a hand a few seconds; autoplay relies on the buffer
+        self.end_game(RESULT_MESSAGES[outcome])
 
     def end_game(self, message):
         """End current game with animation"""
-        self.game_in_progress = False
         self.result_label.config(text=message)
         self.disable_game_buttons()
         
-        # Update UI and move cards to discard pile
+        # Update UI and discard pile (cards were moved by the engine)
         self.update_ui(reveal_dealer=True)
-        self.discard_pile.extend(self.player_hand + self.dealer_hand)
         self.update_discard_ui()
 
         # Re-enable betting after a short delay
-        if self.balance <= 0:
+        if self.engine.balance <= 0:
             self.result_label.config(text="💸 Game Over! No money left!")
             self.disable_all_betting()
         else:
-            self.master.after(2000, self._ready_for_next_game)
+            self.scheduler.schedule(2000, self._ready_for_next_game)
 
     def _ready_for_next_game(self):
         """Prepare for next game"""
         self.enable_betting_buttons()
         if self.result_label.cget('text') not in ["💸 Game Over! No money left!"]:
             self.result_label.config(text="🎰 Ready for next hand!")
+        self.engine.shuffle_if_due()  # before the next bet, so the count shown is the new shoe's
 
     # UI Update Methods (optimized)
     def _update_button_states(self, buttons, state):
@@ -640,10 +820,10 @@ class BlackjackApp:
         self.action_buttons['stand'].config(state='normal')
         
         # Conditional enables
-        double_state = 'normal' if (self.can_double_down and self.bet <= self.balance) else 'disabled'
+        double_state = 'normal' if self.engine.double_allowed() else 'disabled'
         self.action_buttons['double'].config(state=double_state)
         
-        split_state = 'normal' if (self.can_split and self.bet <= self.balance) else 'disabled'
+        split_state = 'normal' if (self.engine.can_split and self.engine.bet <= self.engine.balance) else 'disabled'
         self.split_btn.config(state=split_state)
         
         # Note: betting buttons managed separately
@@ -658,12 +838,14 @@ class BlackjackApp:
     def enable_betting_buttons(self):
         """Enable betting buttons based on balance"""
         for amount, button in self.token_buttons.items():
-            state = 'normal' if self.balance >= amount else 'disabled'
+            state = 'normal' if self.engine.balance >= amount else 'disabled'
             button.config(state=state)
+        amount = self._kelly_bet(self._calculate_true_count())
+        self.suggest_btn.config(state='normal' if amount else 'disabled')
 
     def disable_betting_buttons(self):
         """Disable betting buttons during gameplay"""
-        betting_buttons = list(self.token_buttons.values())
+        betting_buttons = list(self.token_buttons.values()) + [self.suggest_btn]
         self._update_button_states(betting_buttons, 'disabled')
 
     def disable_all_betting(self):
@@ -671,108 +853,241 @@ class BlackjackApp:
         self.disable_betting_buttons()
 
     def update_discard_ui(self):
-        """Update discard pile display - show only last card"""
-        clear_frame(self.discard_frame)
-        self.discard_imgs = []
-        self.discard_count_label.config(text=f"({len(self.discard_pile)} cards used)")
-        
-        # Show only the last card
-        if self.discard_pile:
-            last_card = self.discard_pile[-1]
-            self._add_card_to_frame(last_card, self.discard_frame, is_thumbnail=True)
-
-    def _add_card_to_frame(self, card, frame, is_thumbnail=False):
-        """Add a card to specified frame"""
-        img_func = card_thumbnail if is_thumbnail else card_image
-        img = img_func(card)
-        
-        if img:
-            lbl = tk.Label(frame, image=img, bg=COLORS['bg_table'])
-            lbl.pack(side=tk.LEFT, padx=2 if is_thumbnail else 4)
-            if is_thumbnail:
-                self.discard_imgs.append(img)
-            else:
-                return img
-        else:
-            # Fallback text display
-            size_config = (6, 4, 7) if is_thumbnail else (12, 8, 8)
-            width, height, font_size = size_config
-            
-            lbl = tk.Label(frame, text=card.replace('_', ' ').title(),
-                          bg='white', fg='black', width=width, height=height,
-                          font=('Arial', font_size, 'bold'), relief='raised', bd=3)
-            lbl.pack(side=tk.LEFT, padx=2 if is_thumbnail else 4)
+        """Update discard pile display - show only last card (drawn on the next render)"""
+        self._discard_dirty = True
+        self._schedule_render()
+
+    def _card_fallback(self, card, is_thumbnail=False):
+        """Text label options for a card without an image"""
+        if card == "back":
+            return dict(text="🂠\nCARD\nBACK", bg='#1a472a', fg=COLORS['text_primary'],
+                        width=12, height=8, font=('Arial', 10, 'bold'), relief='raised', bd=3)
+        size_config = (6, 4, 7) if is_thumbnail else (12, 8, 8)
+        width, height, font_size = size_config
+        return dict(text=card_name(card).replace('_', ' ').title(),
+                    bg='white', fg='black', width=width, height=height,
+                    font=('Arial', font_size, 'bold'), relief='raised', bd=3)
+
+    def _on_images_ready(self):
+        """Swap any text placeholders shown during preloading for the real images"""
+        for row in (self.dealer_row, self.player_row, self.discard_row):
+            row.refresh()
+
+    def _create_card_rows(self):
+        """Retained card rows; only changed card widgets are touched on redraw"""
+        if self.renderer == 'canvas':
+            animate = not self.scheduler.turbo
+            self.dealer_row = self.table.card_row(240, 60, 88, card_image, self._card_fallback, animate)
+            self.player_row = self.table.card_row(240, 320, 88, card_image, self._card_fallback, animate)
+            self.discard_row = self.table.card_row(770, 95, 44, card_thumbnail,
+                                                   lambda card: self._card_fallback(card, is_thumbnail=True),
+                                                   animate=False)
+            return
+
+        self.dealer_row = CardRow(self.dealer_frame, card_image, self._card_fallback,
+                                  padx=4, bg=COLORS['bg_table'])
+        self.player_row = CardRow(self.player_frame, card_image, self._card_fallback,
+                                  padx=4, bg=COLORS['bg_table'])
+        self.discard_row = CardRow(self.discard_frame, card_thumbnail,
+                                   lambda card: self._card_fallback(card, is_thumbnail=True),
+                                   padx=2, bg=COLORS['bg_table'])
 
     def update_ui(self, reveal_dealer=False):
-        """Update main game UI"""
+        """Update main game UI (coalesced into one render per Tk idle cycle)"""
+        self._reveal_dealer = reveal_dealer
+        self._schedule_render()
+
+    def _schedule_render(self):
+        if self.autoplay:
+            return  # autoplay redraws on its own throttled schedule
+        if not self._render_pending:
+            self._render_pending = True
+            self.master.after_idle(self._render)
+
+    def _render(self):
+        """Apply all pending state changes to the widgets in one pass"""
+        self._render_pending = False
+        render_start = time.perf_counter()
+        reveal_dealer = self._reveal_dealer
+
         # Update labels
-        self.balance_label.config(text=f"💰 Balance: ${self.balance}")
-        self.bet_label.config(text=f"Current Bet: ${self.bet}")
-        self.deck_info_label.config(text=f"📚 Cards Remaining: {len(self.deck)} / {self.total_cards}")
-
-        # Clear card frames
-        clear_frame(self.dealer_frame)
-        clear_frame(self.player_frame)
-        self.dealer_imgs = []
-        self.player_imgs = []
-
-        # Update dealer cards
-        self._update_dealer_cards(reveal_dealer)
-        
-        # Update player cards
-        for card in self.player_hand:
-            img = self._add_card_to_frame(card, self.player_frame)
-            if img:
-                self.player_imgs.append(img)
+        self.balance_label.config(text=f"💰 Balance: ${self.engine.balance}")
+        self.bet_label.config(text=f"Current Bet: ${self.engine.bet}")
+        self.deck_info_label.config(text=self._deck_info_text())
+        self.stats_label.config(text=self._stats_text())
+
+        # Update cards: dealer hole card shows its back until revealed
+        self.dealer_row.render(card if idx == 0 or reveal_dealer else "back"
+                               for idx, card in enumerate(self.engine.dealer_hand))
+        self.player_row.render(self.engine.player_hand)
 
         # Update scores
         if reveal_dealer:
-            self.dealer_score_label.config(text=f"Score: {calculate_score(self.dealer_hand)}")
+            self.dealer_score_label.config(text=f"Score: {self.engine.dealer_score()}")
         else:
             self.dealer_score_label.config(text="Score: ?")
         
-        if self.player_hand:
-            self.player_score_label.config(text=f"Score: {calculate_score(self.player_hand)}")
+        if self.engine.player_hand:
+            self.player_score_label.config(text=f"Score: {self.engine.player_score()}")
+
+        if self._discard_dirty:
+            self._discard_dirty = False
+            discard_pile = self.engine.discard_pile
+            self.discard_count_label.config(text=f"({len(discard_pile)} cards used)")
+            self.discard_row.render(discard_pile[-DISCARD_SHOW_MAX:])
         
         # Update card counting display
         self.update_counting_display()
+        self.frame_times.append(time.perf_counter() - render_start)
 
-    def _update_dealer_cards(self, reveal_dealer):
-        """Update dealer card display"""
-        for idx, card in enumerate(self.dealer_hand):
-            if idx == 0 or reveal_dealer:
-                img = self._add_card_to_frame(card, self.dealer_frame)
-                if img:
-                    self.dealer_imgs.append(img)
-            else:
-                # Show card back
-                img = card_image("back")
-                if img:
-                    lbl = tk.Label(self.dealer_frame, image=img, bg=COLORS['bg_table'])
-                    lbl.pack(side=tk.LEFT, padx=4)
-                    self.dealer_imgs.append(img)
-                else:
-                    lbl = tk.Label(self.dealer_frame, text="🂠\nCARD\nBACK",
-                                  bg='#1a472a', fg=COLORS['text_primary'], width=12, height=8,
-                                  font=('Arial', 10, 'bold'), relief='raised', bd=3)
-                    lbl.pack(side=tk.LEFT, padx=4)
+    def set_count_system(self, name):
+        """Show another counting system in the panel (counts are kept for all of them)"""
+        self.engine.count_system = name
+        self.count_system_var.set(name)
+        self.edges = load_edges(RuleConfig.from_engine(self.engine))
+        self.update_counting_display()
+        if not self.engine.game_in_progress:
+            self.enable_betting_buttons()
+
+    # Profiling
+    def enable_profiling(self, pinned=False):
+        """Start timing the hot paths (no cost at all until this is called)"""
+        self._profiling_pinned = self._profiling_pinned or pinned
+        if not self.profiler.enabled:
+            instrument_app(self.profiler, self)
+
+    def disable_profiling(self):
+        self.profiler.disable()
+
+    def toggle_profile_overlay(self, event=None):
+        """Show or hide the profiling overlay; profiling runs while it is shown"""
+        if self.profile_overlay is None:
+            self.enable_profiling()
+            self.profile_overlay = tk.Label(self.master, font=('Courier', 9), justify='left',
+                                            anchor='nw', bg='black', fg='#00ff00')
+            self.profile_overlay.place(relx=1.0, x=-10, y=10, anchor='ne')
+            self._refresh_profile_overlay()
+            return
+        if self._profile_overlay_after is not None:
+            self.master.after_cancel(self._profile_overlay_after)
+            self._profile_overlay_after = None
+        self.profile_overlay.destroy()
+        self.profile_overlay = None
+        if not self._profiling_pinned:
+            self.disable_profiling()
+
+    def _refresh_profile_overlay(self):
+        lines = [f"{'name':<26}{'calls':>7}{'mean':>8}{'p95':>8}{'max':>8}"]
+        rows = self.profiler.rows()
+        timings = [row for row in rows if row['unit'] == 'us'][:PROFILE_OVERLAY_ROWS]
+        for row in timings + [row for row in rows if row['unit'] != 'us']:
+            unit = 'us' if row['unit'] == 'us' else ''
+            lines.append(f"{row['name'][:25]:<26}{row['count']:>7}{row['mean']:>8.1f}"
+                         f"{row['p95']:>8.0f}{row['max']:>8.0f} {unit}")
+        self.profile_overlay.config(text="\n".join(lines))
+        self.profile_overlay.lift()
+        self._profile_overlay_after = self.master.after(PROFILE_OVERLAY_MS,
+                                                        self._refresh_profile_overlay)
+
+    # Autoplay
+    def toggle_autoplay(self):
+        if self.autoplay:
+            self.stop_autoplay()
+        else:
+            self.start_autoplay()
+
+    def start_autoplay(self):
+        """Play basic strategy with a true-count bet ramp as fast as the engine allows"""
+        if self.autoplay or self.engine.game_in_progress:
+            return
+        self.autoplay = True
+        self.autoplay_hands = 0
+        self._autoplay_prev_turbo = self.scheduler.turbo
+        self.set_turbo(True)
+        self.scheduler.cancel_all()  # e.g. a start_new_round still queued by quick_bet
+        self._cancel_ev()
+        self.autoplay_btn.config(text="⏹ Stop Autoplay")
+        self._autoplay_after = self.master.after(0, self._autoplay_tick)
+
+    def stop_autoplay(self):
+        """Stop after the current hand; the hand in progress always completes within a tick"""
+        if not self.autoplay:
+            return
+        self.autoplay = False
+        if self._autoplay_after is not None:
+            self.master.after_cancel(self._autoplay_after)
+            self._autoplay_after = None
+        self.set_turbo(self._autoplay_prev_turbo)
+        self.autoplay_btn.config(text="🤖 Autoplay")
+        self.result_label.config(text=f"🤖 Autoplay stopped after {self.autoplay_hands} hands")
+        self.update_ui(reveal_dealer=True)
+        self.update_discard_ui()
+
+    def _autoplay_bet(self):
+        """Kelly bet when an edge table is cached (flat under CSM), else the fixed ramp; capped by the balance"""
+        true_count = self._calculate_true_count()
+        if self.edges is not None or self.engine.csm:
+            return self._kelly_bet(true_count)
+        units = 1
+        for threshold, ramp_units in self.autoplay_ramp:
+            if true_count >= threshold:
+                units = ramp_units
+        return min(units * self.autoplay_unit, self.engine.balance)
+
+    def _autoplay_decide(self):
+        """Basic strategy move through the normal button handlers"""
+        action = basic_strategy(self.engine)
+        {HIT: self.hit, STAND: self.stand, DOUBLE: self.double_down}[action]()
+
+    def _autoplay_tick(self):
+        """Play hands for one time slice, then redraw once and yield to Tk"""
+        self._autoplay_after = None
+        deadline = time.perf_counter() + AUTOPLAY_SLICE_MS / 1000
+        played = 0
+        broke = False
+        while self.autoplay and time.perf_counter() < deadline:
+            self.engine.shuffle_if_due()  # size the bet on the count of the shoe it is played from
+            bet = self._autoplay_bet()
+            if bet < 1:
+                broke = True
+                break
+            self.quick_bet(bet)
+            self.scheduler.flush()  # turbo: the whole hand runs right here
+            self.autoplay_hands += 1
+            played += 1
+            if self.autoplay_render_every and played >= self.autoplay_render_every:
+                break
+
+        self._reveal_dealer = True
+        self._discard_dirty = True
+        self._render()
+        if broke:
+            self.stop_autoplay()
+        elif self.autoplay:
+            self._autoplay_after = self.master.after(AUTOPLAY_TICK_MS, self._autoplay_tick)
+
+    def set_speed(self, speed):
+        """Scale every round delay (2.0 = twice as fast)"""
+        self.scheduler.set_speed(speed)
+
+    def set_turbo(self, turbo):
+        """Zero-delay rounds; only the state where play stops gets rendered"""
+        self.scheduler.set_turbo(turbo)
+        if self.renderer == 'canvas':
+            self.dealer_row.animate = self.player_row.animate = not turbo
 
     def new_game(self):
         """Start new game"""
-        if self.balance <= 0:
+        if self.engine.balance <= 0:
             self.reset_balance()
             return
         self.reset_game()
 
     def reset_game(self):
         """Reset game to initial state"""
-        self.bet = 0
-        self.insurance_bet = 0
-        self.game_in_progress = False
-        self.can_double_down = False
-        self.can_split = False
-        self.player_hand = []
-        self.dealer_hand = []
+        self.scheduler.cancel_all()  # stale callbacks must not touch the new round
+        self.engine.clear_round()
+        self._cancel_ev()
         
         self.result_label.config(text="🎰 Use Quick Bet tokens to start!")
         self.disable_game_buttons()
@@ -782,9 +1097,5 @@ class BlackjackApp:
 
     def reset_balance(self):
         """Reset balance to initial amount"""
-        self.balance = 1000
-        # Reset counting when balance is reset
-        self.running_count = 0
-        self.cards_seen = 0
-        self.discard_pile.clear()
+        self.engine.reset_balance()
         self.reset_game()
\ No newline at end of file
@@ -0,0 +1,206 @@
+# vecsim.py
+"""Vectorized shoe simulator.
+
+Holds K shoes as a 2-D array of shuffled card values and plays one hand in
+every shoe at once, advancing all of them one decision at a time with masked
+NumPy operations. Rules match BlackjackEngine: NUM_DECKS shoe, reshuffle at
+the cut card before any draw, dealer stands on all 17s, blackjack pays 3:2,
+insurance pays even money on half the bet, double down on any two cards.
+
+Shoe i is shuffled by stream i of the shuffle.py SplitMix64 generator, so row
+0 deals exactly the shoes a BlackjackEngine with the same seed deals. Each
+shoe's next order is prepared ahead of time, and the prepared orders are
+refilled in one batched Fisher-Yates pass over every row that used its order.
+
+Results are per unit of initial bet with an unlimited bankroll, like
+`engine.simulate`. Requires NumPy (`pip install numpy`).
+"""
+from dataclasses import dataclass
+
+import numpy as np
+
+from deck import CARD_VALUE, NUM_DECKS, single_deck_template
+from engine import DEALER_STANDS_ON, HIT, STAND, DOUBLE, SimulationResult
+from shuffle import DEFAULT_PENETRATION, random_seed, shuffle_batch, stream_seed
+from strategy import basic_action
+
+# Action codes used in the lookup table
+ACT_HIT = 0
+ACT_STAND = 1
+ACT_DOUBLE = 2
+_ACTION_CODES = {HIT: ACT_HIT, STAND: ACT_STAND, DOUBLE: ACT_DOUBLE}
+
+
+def _build_action_table():
+    """Basic strategy as table[can_double, soft, total, upcard_value]"""
+    table = np.full((2, 2, 32, 12), ACT_STAND, dtype=np.int8)
+    for can_double in (0, 1):
+        for soft in (0, 1):
+            for total in range(4, 22):
+                for upcard in range(2, 12):
+                    action = basic_action(total, bool(soft), upcard, bool(can_double))
+                    table[can_double, soft, total, upcard] = _ACTION_CODES[action]
+    return table
+
+
+BASIC_ACTIONS = _build_action_table()
+
+
+@dataclass
+class VectorResult:
+    """Per-hand outcomes (net per unit bet) and Hi-Lo true counts at bet time"""
+    net: np.ndarray
+    true_count: np.ndarray
+
+    def summary(self):
+        net = self.net.astype(np.float64)
+        return SimulationResult(len(net), float(net.sum()), float(np.dot(net, net)))
+
+
+class VectorShoes:
+    """K independent shoes played in lockstep"""
+
+    def __init__(self, n_shoes, seed=None, actions=BASIC_ACTIONS, insurance_true_count=None,
+                 penetration=DEFAULT_PENETRATION):
+        seed = random_seed() if seed is None else seed
+        self.n_shoes = n_shoes
+        self.actions = actions
+        self.insurance_true_count = insurance_true_count
+
+        self._base = np.array([CARD_VALUE[c] for c in single_deck_template] * NUM_DECKS,
+                              dtype=np.int8)
+        self.size = len(self._base)
+        self.cut_card = int(self.size * penetration)
+        self.shoes = np.empty((n_shoes, self.size), dtype=np.int8)
+        self._seeds = np.array([stream_seed(seed, i) for i in range(n_shoes)], dtype=np.uint64)
+        self._draws = np.zeros(n_shoes, dtype=np.uint64)  # stream position of each shoe
+        self._next = np.empty((n_shoes, self.size), dtype=np.int8)
+        self._next_used = np.ones(n_shoes, dtype=bool)
+        self.pos = np.zeros(n_shoes, dtype=np.int32)
+        self.running_count = np.zeros(n_shoes, dtype=np.int32)
+        self._rows = np.arange(n_shoes)
+        self._reshuffle(np.ones(n_shoes, dtype=bool))
+
+    def _reshuffle(self, rows):
+        """Reshuffle the selected shoes and reset their counts"""
+        idx = np.nonzero(rows)[0]
+        if self._next_used[idx].any():
+            # Refill every used order at once, not just the rows needed now
+            refill = np.nonzero(self._next_used)[0]
+            draws = self._draws[refill]
+            self._next[refill] = shuffle_batch(self._base, self._seeds[refill], draws)
+            self._draws[refill] = draws
+            self._next_used[refill] = False
+        self.shoes[idx] = self._next[idx]
+        self._next_used[idx] = True
+        self.pos[idx] = 0
+        self.running_count[idx] = 0
+
+    def _draw(self, mask):
+        """Draw one card in every shoe selected by mask; other rows get 0"""
+        empty = mask & (self.pos >= self.size)  # the cut card is handled between rounds
+        if empty.any():
+            self._reshuffle(empty)
+        idx = self._rows[mask]
+        cards = np.zeros(self.n_shoes, dtype=np.int8)
+        drawn = self.shoes[idx, self.size - 1 - self.pos[idx]]  # dealt from the end, like deck.Shoe
+        cards[idx] = drawn
+        self.pos[idx] += 1
+        # Hi-Lo: 2-6 +1, 7-9 0, 10/A -1
+        self.running_count[idx] += (drawn <= 6).astype(np.int32) - (drawn >= 10)
+        return cards
+
+    def true_count(self):
+        decks_remaining = np.maximum((self.size - self.pos) / 52, 0.5)
+        return self.running_count / decks_remaining
+
+    def play_round(self):
+        """Play one hand in every shoe; return (net, true_count) arrays of length K"""
+        everyone = np.ones(self.n_shoes, dtype=bool)
+        need = self.pos >= self.cut_card  # reshuffle between rounds, never mid-hand
+        if need.any():
+            self._reshuffle(need)
+        true_count = self.true_count().astype(np.float32)
+
+        p_hard = np.zeros(self.n_shoes, dtype=np.int16)
+        p_aces = np.zeros(self.n_shoes, dtype=np.int16)
+        d_hard = np.zeros(self.n_shoes, dtype=np.int16)
+        d_aces = np.zeros(self.n_shoes, dtype=np.int16)
+
+        def add(hard, aces, cards):
+            is_ace = cards == 11
+            hard += np.where(is_ace, 1, cards)
+            aces += is_ace
+
+        add(p_hard, p_aces, self._draw(everyone))
+        upcard = self._draw(everyone)
+        add(d_hard, d_aces, upcard)
+        add(p_hard, p_aces, self._draw(everyone))
+        add(d_hard, d_aces, self._draw(everyone))
+
+        player_bj = (p_aces > 0) & (p_hard == 11)
+        dealer_bj = (d_aces > 0) & (d_hard == 11)
+
+        net = np.zeros(self.n_shoes, dtype=np.float32)
+        if self.insurance_true_count is not None:
+            insured = (upcard == 11) & ~player_bj & (true_count >= self.insurance_true_count)
+            net += np.where(insured, np.where(dealer_bj, 0.5, -0.5), 0.0).astype(np.float32)
+
+        # Player decisions, one card at a time across all shoes
+        active = ~player_bj
+        n_cards = np.full(self.n_shoes, 2, dtype=np.int16)
+        doubled = np.zeros(self.n_shoes, dtype=bool)
+        while active.any():
+            soft = (p_aces > 0) & (p_hard <= 11)
+            total = np.where(soft, p_hard + 10, p_hard)
+            action = self.actions[(n_cards == 2).astype(np.int8), soft.astype(np.int8),
+                                  np.minimum(total, 31), upcard]
+            active &= action != ACT_STAND
+            double = active & (action == ACT_DOUBLE)
+            doubled |= double
+            add(p_hard, p_aces, self._draw(active))
+            n_cards += active
+            total = np.where((p_aces > 0) & (p_hard <= 11), p_hard + 10, p_hard)
+            active &= ~double & (total < 21)
+
+        p_total = np.where((p_aces > 0) & (p_hard <= 11), p_hard + 10, p_hard)
+        player_bust = p_total > 21
+
+        # Dealer stands on all 17s; no play after a player bust or blackjack
+        dealer_turn = ~player_bj & ~player_bust
+        while True:
+            d_total = np.where((d_aces > 0) & (d_hard <= 11), d_hard + 10, d_hard)
+            hitting = dealer_turn & (d_total < DEALER_STANDS_ON)
+            if not hitting.any():
+                break
+            add(d_hard, d_aces, self._draw(hitting))
+
+        stake = np.where(doubled, 2.0, 1.0)
+        result = np.select(
+            [player_bj & dealer_bj, player_bj, player_bust, d_total > 21,
+             p_total > d_total, p_total < d_total],
+            [0.0, 1.5, -stake, stake, stake, -stake],
+            default=0.0)
+        net += result.astype(np.float32)
+        return net, true_count
+
+    def iter_rounds(self, n_rounds):
+        """Yield (net, true_count) for n_rounds consecutive hands in every shoe"""
+        for _ in range(n_rounds):
+            yield self.play_round()
+
+
+def simulate_vectorized(n_hands, n_shoes=10000, seed=None, insurance_true_count=None):
+    """Play about n_hands hands spread over n_shoes parallel shoes.
+
+    Returns a VectorResult with one entry per hand. For studies too large to
+    hold in memory, use VectorShoes.iter_rounds and aggregate each batch.
+    """
+    shoes = VectorShoes(n_shoes, seed=seed, insurance_true_count=insurance_true_count)
+    n_rounds = max(1, -(-n_hands // n_shoes))
+    nets = []
+    counts = []
+    for net, true_count in shoes.iter_rounds(n_rounds):
+        nets.append(net)
+        counts.append(true_count)
+    return VectorResult(np.concatenate(nets)[:n_hands], np.concatenate(counts)[:n_hands])